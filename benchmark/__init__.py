@@ -0,0 +1,37 @@
+import time
+from typing import Awaitable, Callable, Sequence
+
+from tortoise import Tortoise
+
+MODELS = [
+    "jauth.model.user",
+    "jauth.model.token",
+    "jauth.model.user_event",
+    "jauth.model.user_extra",
+]
+
+
+async def init_benchmark_db(db_url: str, extra_models: Sequence[str] = ()):
+    # NOTE: use scratch database, schema is generated and rows are left there
+    await Tortoise.init(db_url=db_url, modules={"models": MODELS + list(extra_models)})
+    await Tortoise.generate_schemas(safe=True)
+
+
+async def measure(
+    func: Callable[[str], Awaitable], args: Sequence, iterations: int
+) -> float:
+    # returns average microseconds per call
+    for arg in args[:10]:
+        await func(arg)  # warm up
+
+    started_at = time.perf_counter()
+    for i in range(iterations):
+        await func(args[i % len(args)])
+    return (time.perf_counter() - started_at) / iterations * 1000 * 1000
+
+
+def print_result(name: str, baseline_us: float, result_us: float):
+    print(
+        f"{name:<32} {baseline_us:>10.1f}us -> {result_us:>10.1f}us "
+        f"({(1 - result_us / baseline_us) * 100:>5.1f}% saved)"
+    )
@@ -0,0 +1,23 @@
+from uuid import UUID, uuid4
+
+from tortoise import fields
+from tortoise.models import Model
+
+from jauth.model.field import BinaryUUIDField
+
+
+class CharUUIDRow(Model):
+    # NOTE: same columns with token table before BinaryUUIDField
+    class Meta:
+        table = "benchmark_char_uuid"
+
+    id: UUID = fields.UUIDField(pk=True)
+    user_id: UUID = fields.UUIDField(index=True)
+
+
+class BinaryUUIDRow(Model):
+    class Meta:
+        table = "benchmark_binary_uuid"
+
+    id: UUID = BinaryUUIDField(pk=True, default=uuid4)
+    user_id: UUID = BinaryUUIDField(index=True)
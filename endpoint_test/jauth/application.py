@@ -1,3 +1,4 @@
+import functools
 from typing import Dict
 
 import aiohttp_cors
@@ -9,15 +10,26 @@ from endpoint_test.jauth.external.token.dummy import DummyThirdPartyRequest
 from jauth.config import config
 from jauth.model.token import Token
 from jauth.model.user import UserType, User
+from jauth.model.user_event import UserEvent, UserEventType
+from jauth.model.user_extra import UserExtra
 from jauth.repository.token import TokenRepositoryImpl
 from jauth.repository.user import UserRepositoryImpl
+from jauth.repository.user_event import UserEventRepositoryImpl
 from jauth.resource import json_response
 from jauth.resource.base import BaseResource
 from jauth.resource.internal import InternalHttpResource
 from jauth.resource.token import TokenHttpResource
 from jauth.resource.users import UsersHttpResource
+from jauth.task.token_sweeper import ExpiredTokenSweeper
+from jauth.task.user_event_dispatcher import UserEventDispatcher
+from jauth.util.admission import AdmissionController
+from jauth.util.batch_writer import BatchWriter
+from jauth.util.cache import LruTtlCache
 from jauth.util.logger.logger import get_logger
-from jauth.util.tortoise import init_db
+from jauth.util.metric import MetricRegistry
+from jauth.util.password import PasswordHasher
+from jauth.util.replica import ReplicaRouter
+from jauth.util.tortoise import get_pool_stats, init_db
 from jauth.util.util import object_to_dict
 
 
@@ -34,15 +46,97 @@ async def application():
     logger.debug(object_to_dict(config))
     mysql_config = config.api_server.mysql
 
-    await init_db(
+    replica_connection_names = await init_db(
         host=mysql_config.host,
         port=mysql_config.port,
         user=mysql_config.user,
         password=mysql_config.password,
         db=mysql_config.database,
+        minsize=mysql_config.minsize,
+        maxsize=mysql_config.maxsize,
+        pool_recycle=mysql_config.pool_recycle,
+        connect_timeout=mysql_config.connect_timeout,
+        acquire_timeout=mysql_config.acquire_timeout,
+        replica_hosts=mysql_config.replica_hosts,
     )
-    user_repository = UserRepositoryImpl()
-    token_repository = TokenRepositoryImpl()
+    metric_registry = MetricRegistry()
+    metric_registry.register("mysql_pool", get_pool_stats)
+    replica_router = None
+    if replica_connection_names:
+        replica_router = ReplicaRouter(
+            replica_connection_names,
+            max_lag=mysql_config.replica_max_lag,
+            read_your_writes_window=mysql_config.read_your_writes_window,
+            check_interval=mysql_config.replica_check_interval,
+        )
+        replica_router.start()
+        metric_registry.register("mysql_replica", replica_router.stats)
+        for name in replica_connection_names:
+            metric_registry.register(
+                f"mysql_pool_{name}", functools.partial(get_pool_stats, name)
+            )
+    hashing_config = config.api_server.password_hashing
+    password_hasher = PasswordHasher(
+        admission_controller=AdmissionController(
+            max_concurrency=hashing_config.worker_count,
+            max_queue_size=hashing_config.max_queue_size,
+        ),
+        executor_type=hashing_config.executor,
+        worker_count=hashing_config.worker_count,
+        rounds=hashing_config.rounds,
+    )
+    if hashing_config.latency_budget_ms:
+        await password_hasher.calibrate(
+            latency_budget_ms=hashing_config.latency_budget_ms,
+            min_rounds=hashing_config.min_rounds,
+            max_rounds=hashing_config.max_rounds,
+        )
+    metric_registry.register("password_hashing", password_hasher.stats)
+
+    user_cache_config = config.api_server.user_cache
+    user_cache = None
+    if user_cache_config.ttl > 0:
+        user_cache = LruTtlCache(
+            max_size=user_cache_config.max_size, ttl=user_cache_config.ttl
+        )
+        metric_registry.register("user_cache", user_cache.stats)
+    not_found_cache = None
+    if user_cache_config.not_found_ttl > 0:
+        not_found_cache = LruTtlCache(
+            max_size=user_cache_config.not_found_max_size,
+            ttl=user_cache_config.not_found_ttl,
+        )
+        metric_registry.register("user_not_found_cache", not_found_cache.stats)
+    user_repository = UserRepositoryImpl(
+        indexed_extra_keys=config.api_server.indexed_extra_keys,
+        replica_router=replica_router,
+        user_cache=user_cache,
+        not_found_cache=not_found_cache,
+    )
+    token_store_config = config.api_server.token_store
+    token_writer = None
+    if token_store_config.backend == "mysql":
+        if token_store_config.batch_window_ms > 0:
+            token_writer = BatchWriter(
+                Token.bulk_create,
+                window_ms=token_store_config.batch_window_ms,
+                max_batch_size=token_store_config.batch_max_size,
+            )
+            metric_registry.register("token_batch_writer", token_writer.stats)
+        token_repository = TokenRepositoryImpl(
+            replica_router=replica_router, token_writer=token_writer
+        )
+    elif token_store_config.backend == "redis":
+        # NOTE: imported here to require aioredis only for redis backend
+        from jauth.repository.token_redis import RedisTokenRepositoryImpl
+
+        token_repository = RedisTokenRepositoryImpl(
+            url=token_store_config.redis_url,
+            ttl=TokenHttpResource.REFRESH_TOKEN_EXPIRE_TIME,
+            key_prefix=token_store_config.redis_key_prefix,
+        )
+    else:
+        raise ValueError(f"unknown token store backend: {token_store_config.backend}")
     external = {
         "third_party": {
             "facebook": DummyThirdPartyRequest(
@@ -79,32 +173,60 @@ async def application():
         "jwt_secret": config.api_server.jwt_secret,
         "internal_api_keys": config.api_server.internal_api_keys,
     }
-    user_creation_callback_handler = DummyCallbackHandler()
-    user_update_callback_handler = DummyCallbackHandler()
+    user_event_repository = UserEventRepositoryImpl()
+    user_event_dispatcher = UserEventDispatcher(
+        user_event_repository=user_event_repository,
+        handlers={
+            UserEventType.CREATION: DummyCallbackHandler(),
+            UserEventType.UPDATE: DummyCallbackHandler(),
+        },
+    )
+    user_event_dispatcher.start()
+    metric_registry.register("user_event_dispatcher", user_event_dispatcher.stats)
+    token_sweeper_config = config.api_server.token_sweeper
+    token_sweeper = ExpiredTokenSweeper(
+        token_repository=token_repository,
+        expire_seconds=TokenHttpResource.REFRESH_TOKEN_EXPIRE_TIME,
+        interval=token_sweeper_config.interval,
+        batch_size=token_sweeper_config.batch_size,
+        batch_interval=token_sweeper_config.batch_interval,
+    )
+    # NOTE: redis expires tokens by itself
+    if token_store_config.backend != "redis":
+        token_sweeper.start()
+        metric_registry.register("token_sweeper", token_sweeper.stats)
 
     resource_list: Dict[str, BaseResource] = {
         "/users": UsersHttpResource(
-            user_creation_callback_handler=user_creation_callback_handler,
-            user_update_callback_handler=user_update_callback_handler,
             user_repository=user_repository,
+            user_event_repository=user_event_repository,
             secret=secret,
             external=external,
+            password_hasher=password_hasher,
         ),
         "/token": TokenHttpResource(
             user_repository=user_repository,
             token_repository=token_repository,
             secret=secret,
             external=external,
+            password_hasher=password_hasher,
         ),
         "/internal": InternalHttpResource(
             user_repository=user_repository,
             secret=secret,
+            metric_registry=metric_registry,
         ),
     }
 
     async def cleanup(request):
         await User.all().delete()
         await Token.all().delete()
+        await UserEvent.all().delete()
+        await UserExtra.all().delete()
+        if user_cache is not None:
+            user_cache.clear()
+        if not_found_cache is not None:
+            not_found_cache.clear()
         return json_response(result={"status": "done"})
 
     app.router.add_get("/storage/clean-up", cleanup)
@@ -114,6 +236,19 @@ async def application():
         resource.route(subapp.router)
         plugin_app(app, path, subapp)
 
+    async def shutdown(_app):
+        if replica_router:
+            await replica_router.stop()
+        await user_event_dispatcher.stop()
+        await token_sweeper.stop()
+        if token_writer is not None:
+            await token_writer.close()
+        if token_store_config.backend == "redis":
+            await token_repository.close()
+        password_hasher.shutdown()
+
+    app.on_cleanup.append(shutdown)
+
     cors = aiohttp_cors.setup(app)
     allow_url = "*"
 
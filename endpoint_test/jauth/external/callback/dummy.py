@@ -1,3 +1,5 @@
+from typing import List
+
 from jauth.external.callback.base import BaseCallbackHandler
 
 
@@ -6,6 +8,6 @@ class DummyCallbackHandler(BaseCallbackHandler):
         super().__init__([("", "")])
         self.messages = []
 
-    async def handle(self, message: dict) -> bool:
+    async def handle(self, message: dict, delivered_urls: List[str] = ()) -> bool:
         self.messages.append(message)
         return True
@@ -124,3 +124,30 @@ class TestUser(unittest.IsolatedAsyncioTestCase):
                 },
             )
             assert status == 409
+
+    async def test_internal_batch_get_users(self):
+        user_ids = []
+        for index in range(3):
+            status, body, _ = await post(
+                f"{config.tester.endpoint}/users/email",
+                parameters={
+                    "email": "dummy@user.com",
+                    "account": f"dummy{random.randint(0, 9999)}-{index}",
+                    "password": "dummy-password",
+                    "extra": {},
+                },
+            )
+            assert status == 200
+            user_ids.append(body["result"]["id"])
+
+        unknown_id = "00000000-0000-0000-0000-000000000000"
+        status, body, _ = await post(
+            f"{config.tester.endpoint}/internal/users:batchGet",
+            parameters={"ids": user_ids + [unknown_id]},
+            headers={"X-Server-Key": config.tester.internal_api_key},
+        )
+        assert status == 200
+        users = body["result"]
+        for user_id in user_ids:
+            assert users[user_id]["id"] == user_id
+        assert users[unknown_id] is None
@@ -4,6 +4,7 @@ from typing import List
 import deserialize
 
 from jauth.util.configutil import get_config
+from jauth.util.util import to_bool
 
 
 class Config:
@@ -14,20 +15,250 @@ class Config:
         "event_callback_urls",
         lambda arg: [url_set.split("|")[:2] for url_set in arg.split(",")],
     )
+    @deserialize.default("indexed_extra_keys", [])
+    @deserialize.parser(
+        "indexed_extra_keys", lambda arg: [key for key in arg.split(",") if key]
+    )
     @deserialize.default("port", 8080)
     @deserialize.parser("port", int)
     @deserialize.default("logging_level", "DEBUG")
     class APIServer:
+        @deserialize.default("executor", "thread")
+        @deserialize.default("worker_count", 4)
+        @deserialize.parser("worker_count", int)
+        @deserialize.default("max_queue_size", 64)
+        @deserialize.parser("max_queue_size", int)
+        @deserialize.default("rounds", 12)
+        @deserialize.parser("rounds", int)
+        @deserialize.default("latency_budget_ms", 0)
+        @deserialize.parser("latency_budget_ms", int)
+        @deserialize.default("min_rounds", 10)
+        @deserialize.parser("min_rounds", int)
+        @deserialize.default("max_rounds", 16)
+        @deserialize.parser("max_rounds", int)
+        class PasswordHashing:
+            executor: str  # thread or process
+            worker_count: int
+            # pending hashing requests over this size are rejected with 503
+            max_queue_size: int
+            # bcrypt cost, used as it is when latency_budget_ms is 0
+            rounds: int
+            # if set, rounds is calibrated at startup within [min_rounds, max_rounds]
+            latency_budget_ms: int
+            min_rounds: int
+            max_rounds: int
+
         @deserialize.default("port", 3306)
         @deserialize.parser("port", int)
+        @deserialize.default("minsize", 1)
+        @deserialize.parser("minsize", int)
+        @deserialize.default("maxsize", 5)
+        @deserialize.parser("maxsize", int)
+        @deserialize.default("pool_recycle", 3600)
+        @deserialize.parser("pool_recycle", int)
+        @deserialize.default("connect_timeout", 10)
+        @deserialize.parser("connect_timeout", float)
+        @deserialize.default("acquire_timeout", 5)
+        @deserialize.parser("acquire_timeout", float)
+        @deserialize.default("replica_hosts", [])
+        @deserialize.parser(
+            "replica_hosts", lambda arg: [host for host in arg.split(",") if host]
+        )
+        @deserialize.default("replica_max_lag", 5)
+        @deserialize.parser("replica_max_lag", float)
+        @deserialize.default("replica_check_interval", 5)
+        @deserialize.parser("replica_check_interval", float)
+        @deserialize.default("read_your_writes_window", 5)
+        @deserialize.parser("read_your_writes_window", float)
         class MySQL:
             host: str
             port: int
             user: str
             password: str
             database: str
+            # connection pool per worker process
+            minsize: int
+            maxsize: int
+            pool_recycle: int  # seconds to reconnect idle connection, -1 disables
+            connect_timeout: float  # seconds
+            # seconds to wait for free connection before 503, 0 waits forever
+            acquire_timeout: float
+            # comma separated host[:port] of read replicas sharing user and password
+            replica_hosts: List[str]
+            # seconds, replica is not read while lagging more or unreachable
+            replica_max_lag: float
+            replica_check_interval: float
+            # seconds, reads of user written by this process go to primary meanwhile.
+            #  per process only, other workers may read the user from replica
+            read_your_writes_window: float
+
+        @deserialize.default("limit", 100)
+        @deserialize.parser("limit", int)
+        @deserialize.default("limit_per_host", 20)
+        @deserialize.parser("limit_per_host", int)
+        @deserialize.default("dns_cache_ttl", 300)
+        @deserialize.parser("dns_cache_ttl", int)
+        @deserialize.default("keepalive_timeout", 30)
+        @deserialize.parser("keepalive_timeout", float)
+        @deserialize.default("connect_timeout", 3)
+        @deserialize.parser("connect_timeout", float)
+        @deserialize.default("read_timeout", 5)
+        @deserialize.parser("read_timeout", float)
+        class HttpClient:
+            # connection pool size in total and per host
+            limit: int
+            limit_per_host: int
+            dns_cache_ttl: int  # seconds
+            keepalive_timeout: float  # seconds
+            connect_timeout: float  # seconds
+            read_timeout: float  # seconds
+
+        @deserialize.default("verify_mode", "remote")
+        @deserialize.default("remote_fallback", True)
+        @deserialize.parser("remote_fallback", to_bool)
+        @deserialize.default("client_ids", [])
+        @deserialize.parser("client_ids", lambda arg: arg.split(","))
+        class Google:
+            # local: verify id token with google certs (requires client_ids),
+            # remote: call tokeninfo
+            verify_mode: str
+            # call tokeninfo when google certs can not be fetched
+            remote_fallback: bool
+            client_ids: List[str]  # comma separated string to list
+
+        @deserialize.default("max_size", 10000)
+        @deserialize.parser("max_size", int)
+        @deserialize.default("facebook_ttl", 60)
+        @deserialize.parser("facebook_ttl", int)
+        @deserialize.default("kakao_ttl", 60)
+        @deserialize.parser("kakao_ttl", int)
+        @deserialize.default("apple_ttl", 0)
+        @deserialize.parser("apple_ttl", int)
+        @deserialize.default("google_ttl", 0)
+        @deserialize.parser("google_ttl", int)
+        class IdentityCache:
+            # verified third party user by token, per provider
+            max_size: int
+            # seconds, 0 disables cache of the provider.
+            #  cache of jwt token (apple, google) doesn't outlive its exp
+            facebook_ttl: int
+            kakao_ttl: int
+            apple_ttl: int
+            google_ttl: int
+
+        @deserialize.default("max_size", 10000)
+        @deserialize.parser("max_size", int)
+        @deserialize.default("ttl", 5)
+        @deserialize.parser("ttl", int)
+        @deserialize.default("not_found_max_size", 10000)
+        @deserialize.parser("not_found_max_size", int)
+        @deserialize.default("not_found_ttl", 10)
+        @deserialize.parser("not_found_ttl", int)
+        class UserCache:
+            # user by id, invalidated by writes of this process only
+            max_size: int
+            ttl: int  # seconds of staleness from other processes, 0 disables cache
+            # id of missing user, 0 disables cache
+            not_found_max_size: int
+            not_found_ttl: int
+
+        @deserialize.default("deadline", 5)
+        @deserialize.parser("deadline", float)
+        @deserialize.default("hedge", False)
+        @deserialize.parser("hedge", to_bool)
+        @deserialize.default("hedge_percentile", 95)
+        @deserialize.parser("hedge_percentile", float)
+        @deserialize.default("window_size", 50)
+        @deserialize.parser("window_size", int)
+        @deserialize.default("min_calls", 10)
+        @deserialize.parser("min_calls", int)
+        @deserialize.default("failure_rate_threshold", 0.5)
+        @deserialize.parser("failure_rate_threshold", float)
+        @deserialize.default("slow_call_threshold", 2)
+        @deserialize.parser("slow_call_threshold", float)
+        @deserialize.default("slow_call_rate_threshold", 0.8)
+        @deserialize.parser("slow_call_rate_threshold", float)
+        @deserialize.default("open_duration", 30)
+        @deserialize.parser("open_duration", float)
+        class ThirdPartyGuard:
+            deadline: float  # seconds for whole verification including hedged call
+            # send second request after latency percentile of provider
+            hedge: bool
+            hedge_percentile: float
+            # circuit breaker opens when rates of recent calls exceed thresholds
+            window_size: int
+            min_calls: int
+            failure_rate_threshold: float
+            slow_call_threshold: float  # seconds
+            slow_call_rate_threshold: float
+            open_duration: float  # seconds
+
+        @deserialize.default("interval", 1)
+        @deserialize.parser("interval", float)
+        @deserialize.default("batch_size", 100)
+        @deserialize.parser("batch_size", int)
+        @deserialize.default("lease_seconds", 60)
+        @deserialize.parser("lease_seconds", int)
+        @deserialize.default("max_attempts", 10)
+        @deserialize.parser("max_attempts", int)
+        @deserialize.default("base_backoff", 1)
+        @deserialize.parser("base_backoff", float)
+        @deserialize.default("max_backoff", 600)
+        @deserialize.parser("max_backoff", float)
+        @deserialize.default("retention", 7 * 24 * 60 * 60)
+        @deserialize.parser("retention", int)
+        @deserialize.default("callback_timeout", 10)
+        @deserialize.parser("callback_timeout", float)
+        class UserEvent:
+            interval: float  # seconds between polling of pending events
+            batch_size: int
+            # seconds for claimed event to be retried by another dispatcher
+            lease_seconds: int
+            # backoff doubles from base_backoff until max_backoff (seconds)
+            max_attempts: int
+            base_backoff: float
+            max_backoff: float
+            retention: int  # seconds to keep delivered events
+            # seconds for each callback request, must be under half of lease_seconds
+            callback_timeout: float
+
+        @deserialize.default("backend", "mysql")
+        @deserialize.default("redis_url", "redis://localhost:6379/0")
+        @deserialize.default("redis_key_prefix", "jauth:token:")
+        @deserialize.default("batch_window_ms", 0)
+        @deserialize.parser("batch_window_ms", float)
+        @deserialize.default("batch_max_size", 100)
+        @deserialize.parser("batch_max_size", int)
+        class TokenStore:
+            backend: str  # mysql or redis
+            redis_url: str
+            redis_key_prefix: str
+            # mysql only, tokens created within window are inserted at once
+            # until batch_max_size rows, 0 disables batching
+            batch_window_ms: float
+            batch_max_size: int
+
+        @deserialize.default("interval", 60)
+        @deserialize.parser("interval", float)
+        @deserialize.default("batch_size", 500)
+        @deserialize.parser("batch_size", int)
+        @deserialize.default("batch_interval", 0.5)
+        @deserialize.parser("batch_interval", float)
+        class TokenSweeper:
+            interval: float  # seconds between sweeps of expired refresh tokens
+            batch_size: int  # rows deleted by a statement
+            batch_interval: float  # seconds between batches of a sweep
 
         mysql: MySQL
+        http_client: HttpClient
+        google: Google
+        identity_cache: IdentityCache
+        user_cache: UserCache
+        third_party_guard: ThirdPartyGuard
+        user_event: UserEvent
+        token_store: TokenStore
+        token_sweeper: TokenSweeper
+        password_hashing: PasswordHashing
         jwt_secret: str
         port: int
 
@@ -36,6 +267,8 @@ class Config:
         # -> [['https://xxx.xxx/callback', 'TOKEN'], ['https://yyy.xxx/callback', 'TOKEN2']]
         event_callback_urls: List[List[str]]
         internal_api_keys: List[str]  # comma separated string to list
+        # comma separated keys of user extra to be searchable by extra_filters
+        indexed_extra_keys: List[str]
         logging_level: str
 
     api_server: APIServer
@@ -3,6 +3,7 @@ import json
 
 from aiohttp import web
 
+from jauth.exception.overload import OverloadError
 from jauth.exception.request import RequestError
 from jauth.util.logger.logger import get_logger
 
@@ -12,6 +13,7 @@ logger = get_logger(__name__)
 def request_error_handler(func):
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
+        headers = None
         try:
             return await func(*args, **kwargs)
         except json.decoder.JSONDecodeError as e:
@@ -26,6 +28,12 @@ def request_error_handler(func):
             error_msg = str(e)
             status = 400
             logger.error(e)
+        except OverloadError as e:
+            # NOTE: backpressure (full admission queue, exhausted connection pool)
+            error_msg = e.message
+            status = 503
+            headers = {"Retry-After": str(e.retry_after)}
+            logger.warning(e)
         except BaseException as e:
             error_msg = "Unknown error"
             status = 500
@@ -41,6 +49,7 @@ def request_error_handler(func):
             ),
             content_type="application/json",
             status=status,
+            headers=headers,
         )
 
     return wrapper
@@ -0,0 +1,8 @@
+from typing import List
+
+
+class CallbackDeliveryError(Exception):
+    def __init__(self, *args, delivered_urls: List[str] = None):
+        super().__init__(*args)
+        # NOTE: urls which responded 2xx while others failed
+        self.delivered_urls = delivered_urls or []
@@ -0,0 +1,17 @@
+class OverloadError(Exception):
+    message = "server is overloaded"
+
+    def __init__(self, retry_after: int = 1, *args):
+        if not args:
+            args = (self.message,)
+
+        super().__init__(*args)
+        self.retry_after = retry_after
+
+
+class AdmissionRejectedError(OverloadError):
+    message = "too many pending requests"
+
+
+class ConnectionPoolTimeoutError(OverloadError):
+    message = "database connection pool is exhausted"
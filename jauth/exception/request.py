@@ -8,3 +8,15 @@ class TypeConvertError(RequestError):
 
 class IncompleteParameterError(RequestError):
     pass
+
+
+class InvalidCursorError(RequestError):
+    pass
+
+
+class UnindexedExtraKeyError(RequestError):
+    pass
+
+
+class InvalidFilterError(RequestError):
+    pass
@@ -4,3 +4,7 @@ class ResponseError(Exception):
 
 class ThirdPartyTokenVerifyError(ResponseError):
     pass
+
+
+class ThirdPartyUnavailableError(ResponseError):
+    pass
@@ -1,6 +1,10 @@
+from typing import List
+
 from aiohttp import ClientSession
 from pydantic import BaseModel
 
+from jauth.exception.callback import CallbackDeliveryError
+
 
 class BaseCallbackMessage(BaseModel):
     issuer: str = "jauth"
@@ -13,4 +17,26 @@ async def post_json(session: ClientSession, url: str, body: dict, header=None) -
     if header is None:
         header = {}
     async with session.post(url=url, json=body, headers=header) as response:
-        return await response.json()
+        # NOTE: callback is delivered if status is 2xx whatever the body is
+        response.raise_for_status()
+        try:
+            return await response.json(content_type=None)
+        except ValueError:
+            return {}
+
+
+def raise_for_failures(urls: List[str], results: list):
+    failures = [
+        f"{url}: {result!r}"
+        for url, result in zip(urls, results)
+        if isinstance(result, BaseException)
+    ]
+    if failures:
+        raise CallbackDeliveryError(
+            ", ".join(failures),
+            delivered_urls=[
+                url
+                for url, result in zip(urls, results)
+                if not isinstance(result, BaseException)
+            ],
+        )
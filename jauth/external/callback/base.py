@@ -3,9 +3,13 @@ from typing import List, Tuple
 
 
 class BaseCallbackHandler(abc.ABC):
-    def __init__(self, urls: List[Tuple[str, str]]):
+    def __init__(self, urls: List[Tuple[str, str]], timeout: float = 10):
         self.urls = urls
+        self.timeout = timeout  # seconds for whole callback request
+
+    def pending_urls(self, delivered_urls: List[str]) -> List[Tuple[str, str]]:
+        return [url for url in self.urls if url[0] not in delivered_urls]
 
     @abc.abstractmethod
-    async def handle(self, message: dict) -> bool:
+    async def handle(self, message: dict, delivered_urls: List[str] = ()) -> bool:
         raise NotImplemented("Implement handle")
@@ -1,9 +1,13 @@
 import asyncio
 from typing import List, Tuple, Optional
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout
 
-from jauth.external.callback import BaseCallbackMessage, post_json
+from jauth.external.callback import (
+    BaseCallbackMessage,
+    post_json,
+    raise_for_failures,
+)
 from jauth.external.callback.base import BaseCallbackHandler
 from jauth.util.logger.logger import get_logger
 from jauth.util.util import utc_now
@@ -20,15 +24,16 @@ class UserUpdateCallbackMessage(BaseCallbackMessage):
 
 
 class UserUpdateCallbackHandler(BaseCallbackHandler):
-    def __init__(self, urls: List[Tuple[str, str]]):
+    def __init__(self, urls: List[Tuple[str, str]], timeout: float = 10):
         # Tuple[str, str] : (URL, TOKEN)
-        super().__init__(urls)
+        super().__init__(urls, timeout)
 
-    async def handle(self, message: dict) -> bool:
+    async def handle(self, message: dict, delivered_urls: List[str] = ()) -> bool:
         user_id = str(message["id"])
         logger.info(f"Generate user deletion event with {user_id}")
-        async with ClientSession() as session:
-            await asyncio.gather(
+        urls = self.pending_urls(delivered_urls)
+        async with ClientSession(timeout=ClientTimeout(total=self.timeout)) as session:
+            results = await asyncio.gather(
                 *[
                     post_json(
                         session=session,
@@ -44,8 +49,9 @@ class UserUpdateCallbackHandler(BaseCallbackHandler):
                             user__extra=message["extra"],
                         ).dict(),
                     )
-                    for url in self.urls
+                    for url in urls
                 ],
                 return_exceptions=True,
             )
+        raise_for_failures([url[0] for url in urls], results)
         return True
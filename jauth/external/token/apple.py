@@ -2,8 +2,9 @@ import deserialize
 
 from jauth.exception.third_party import ThirdPartyTokenVerifyError
 from jauth.external.token import ThirdPartyUser
-from jauth.util.request import Request
-from jwcrypto import jwt, jwk
+from jauth.external.token.jwks import JwksCache
+from jauth.util.request import Request, HttpClient
+from jwcrypto import jwt
 import jwt as pyjwt
 
 from jauth.model.user import UserType
@@ -28,25 +29,17 @@ class AppleToken(Request):
     JWK_HOST = "https://appleid.apple.com"
     JWK_RESOURCE = "/auth/keys"
 
-    async def _get_jwk_sets(self):
-        status, response, _ = await self.get(url=f"{self.JWK_HOST}{self.JWK_RESOURCE}")
-
-        if not 200 <= status < 300:
-            raise ThirdPartyTokenVerifyError(f"status is not OK: {status} / {response}")
-
-        key_sets = response["keys"]
-        public_keys = {}
-        for key in key_sets:
-            public_keys[key["kid"]] = key
-
-        return public_keys
+    def __init__(self, http_client: HttpClient):
+        super().__init__(http_client)
+        self.jwks = JwksCache(self, url=f"{self.JWK_HOST}{self.JWK_RESOURCE}")
 
     async def get_user(self, token) -> ThirdPartyUser:
-        public_keys = await self._get_jwk_sets()
-        key_id = pyjwt.get_unverified_header(token)["kid"]
+        try:
+            key_id = pyjwt.get_unverified_header(token)["kid"]
+        except (pyjwt.PyJWTError, KeyError):
+            raise ThirdPartyTokenVerifyError("invalid jwt")
 
-        jwt_public_key = public_keys[key_id]
-        apple_jwk = jwk.JWK(**jwt_public_key)
+        apple_jwk = await self.jwks.get_key(key_id)
         try:
             apple_jwt = jwt.JWT(key=apple_jwk, jwt=token)
         except BaseException:
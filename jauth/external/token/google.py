@@ -1,9 +1,21 @@
+from typing import List
+
 import deserialize
+import jwt as pyjwt
+from jwcrypto import jwt
 
-from jauth.exception.third_party import ThirdPartyTokenVerifyError
+from jauth.exception.third_party import (
+    ThirdPartyTokenVerifyError,
+    ThirdPartyUnavailableError,
+)
 from jauth.external.token import ThirdPartyUser
-from jauth.util.request import Request
+from jauth.external.token.jwks import JwksCache
+from jauth.util.logger.logger import get_logger
+from jauth.util.request import Request, HttpClient
 from jauth.model.user import UserType
+from jauth.util.util import to_bool
+
+logger = get_logger(__name__)
 
 
 @deserialize.default("sub", "")
@@ -12,6 +24,7 @@ from jauth.model.user import UserType
 @deserialize.default("name", "")
 @deserialize.default("picture", "")
 @deserialize.default("locale", "")
+@deserialize.parser("email_verified", to_bool)
 class GoogleUser:
     sub: str
     email: str
@@ -24,8 +37,52 @@ class GoogleUser:
 class GoogleToken(Request):
     API_HOST = "https://oauth2.googleapis.com"
     USER_RESOURCE = "/tokeninfo"
+    JWK_HOST = "https://www.googleapis.com"
+    JWK_RESOURCE = "/oauth2/v3/certs"
+    ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
 
-    async def get_user(self, token) -> ThirdPartyUser:
+    def __init__(
+        self,
+        http_client: HttpClient,
+        verify_mode: str = "local",
+        remote_fallback: bool = True,
+        client_ids: List[str] = (),
+    ):
+        super().__init__(http_client)
+        if verify_mode not in ("local", "remote"):
+            raise ValueError(f"unknown google verify mode: {verify_mode}")
+
+        if verify_mode == "local" and not client_ids:
+            # NOTE: without aud check, id token issued to any oauth client is accepted
+            raise ValueError("google client ids are required for local verify mode")
+
+        self.verify_mode = verify_mode
+        self.remote_fallback = remote_fallback
+        self.client_ids = set(client_ids)
+        self.jwks = JwksCache(self, url=f"{self.JWK_HOST}{self.JWK_RESOURCE}")
+
+    async def _get_google_user_locally(self, token) -> GoogleUser:
+        try:
+            key_id = pyjwt.get_unverified_header(token)["kid"]
+        except (pyjwt.PyJWTError, KeyError):
+            raise ThirdPartyTokenVerifyError("invalid jwt")
+
+        google_jwk = await self.jwks.get_key(key_id)
+        try:
+            google_jwt = jwt.JWT(key=google_jwk, jwt=token, check_claims={"exp": None})
+        except BaseException:
+            raise ThirdPartyTokenVerifyError("invalid jwt")
+
+        claims = jwt.json_decode(google_jwt.claims)
+        if claims.get("iss") not in self.ISSUERS:
+            raise ThirdPartyTokenVerifyError(f"invalid issuer: {claims.get('iss')}")
+
+        if claims.get("aud") not in self.client_ids:
+            raise ThirdPartyTokenVerifyError(f"invalid audience: {claims.get('aud')}")
+
+        return deserialize.deserialize(GoogleUser, claims)
+
+    async def _get_google_user_remotely(self, token) -> GoogleUser:
         status, response, _ = await self.get(
             url=f"{self.API_HOST}{self.USER_RESOURCE}",
             parameters={
@@ -33,10 +90,25 @@ class GoogleToken(Request):
             },
         )
 
+        if status >= 500:
+            raise ThirdPartyUnavailableError(f"Status is not OK: {status} / {response}")
+
         if not 200 <= status < 300:
             raise ThirdPartyTokenVerifyError(f"Status is not OK: {status} / {response}")
 
-        google_user: GoogleUser = deserialize.deserialize(GoogleUser, response)
+        return deserialize.deserialize(GoogleUser, response)
+
+    async def get_user(self, token) -> ThirdPartyUser:
+        if self.verify_mode == "remote":
+            google_user = await self._get_google_user_remotely(token)
+        else:
+            try:
+                google_user = await self._get_google_user_locally(token)
+            except ThirdPartyUnavailableError as e:
+                if not self.remote_fallback:
+                    raise
+                logger.warning(f"Fallback to remote verification: {e}")
+                google_user = await self._get_google_user_remotely(token)
 
         return deserialize.deserialize(
             ThirdPartyUser,
@@ -0,0 +1,120 @@
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from jwcrypto import jwk
+
+from jauth.exception.third_party import (
+    ThirdPartyTokenVerifyError,
+    ThirdPartyUnavailableError,
+)
+from jauth.util.logger.logger import get_logger
+from jauth.util.request import Request
+from jauth.util.single_flight import SingleFlight
+
+logger = get_logger(__name__)
+
+max_age_pattern = re.compile(r"max-age=(\d+)", re.IGNORECASE)
+
+
+def get_max_age(cache_control: Optional[str]) -> Optional[int]:
+    if not cache_control:
+        return None
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    matched = max_age_pattern.search(cache_control)
+    if matched is None:
+        return None
+    return int(matched.group(1))
+
+
+class JwksCache:
+    def __init__(
+        self,
+        request: Request,
+        url: str,
+        default_ttl: int = 60 * 60,
+        min_refresh_interval: int = 30,
+        refresh_ahead_ratio: float = 0.8,
+    ):
+        self.request = request
+        self.url = url
+        self.default_ttl = default_ttl
+        # NOTE: limits forced refreshes by tokens with unknown kid
+        self.min_refresh_interval = min_refresh_interval
+        # NOTE: keys are refreshed in background after this ratio of ttl passed
+        self.refresh_ahead_ratio = refresh_ahead_ratio
+        self._keys: Dict[str, jwk.JWK] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._single_flight = SingleFlight()
+        self._background_refresh: Optional[asyncio.Task] = None
+        self.served = 0
+        self.refreshes_on_unknown_key = 0
+
+    async def _fetch(self):
+        try:
+            status, response, headers = await self.request.get(url=self.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ThirdPartyUnavailableError(f"failed to fetch {self.url}: {e}")
+
+        if not 200 <= status < 300:
+            raise ThirdPartyUnavailableError(f"status is not OK: {status} / {response}")
+
+        self._keys = {key["kid"]: jwk.JWK(**key) for key in response["keys"]}
+        max_age = get_max_age(headers.get("Cache-Control"))
+        if max_age is None:
+            max_age = self.default_ttl
+
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + max_age
+        logger.debug(f"Fetched {len(self._keys)} keys from {self.url} ({max_age}s)")
+
+    async def refresh(self):
+        await self._single_flight.do(self.url, self._fetch)
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except ThirdPartyUnavailableError as e:
+            logger.warning(f"Background refresh failed: {e}")
+
+    def _refresh_in_background(self):
+        if self._background_refresh is None or self._background_refresh.done():
+            self._background_refresh = asyncio.ensure_future(self._refresh_quietly())
+
+    async def get_key(self, key_id: str) -> jwk.JWK:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            await self.refresh()
+        elif now >= self._fetched_at + (
+            (self._expires_at - self._fetched_at) * self.refresh_ahead_ratio
+        ):
+            self._refresh_in_background()
+
+        key = self._keys.get(key_id)
+        if key is None and (
+            time.monotonic() - self._fetched_at >= self.min_refresh_interval
+        ):
+            # NOTE: keys might be rotated before cache expiration
+            self.refreshes_on_unknown_key += 1
+            await self.refresh()
+            key = self._keys.get(key_id)
+
+        if key is None:
+            raise ThirdPartyTokenVerifyError(f"unknown key id: {key_id}")
+
+        self.served += 1
+        return key
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "expires_in": max(self._expires_at - time.monotonic(), 0),
+            "served": self.served,
+            "fetches": self._single_flight.executed,
+            "coalesced_fetches": self._single_flight.shared,
+            "refreshes_on_unknown_key": self.refreshes_on_unknown_key,
+        }
@@ -1,6 +1,9 @@
 import deserialize
 
-from jauth.exception.third_party import ThirdPartyTokenVerifyError
+from jauth.exception.third_party import (
+    ThirdPartyTokenVerifyError,
+    ThirdPartyUnavailableError,
+)
 from jauth.external.token import ThirdPartyUser
 from jauth.util.request import Request
 from jauth.model.user import UserType
@@ -57,6 +60,9 @@ class KakaoToken(Request):
             url=f"{self.API_HOST}{self.USER_RESOURCE}", headers=headers
         )
 
+        if status >= 500:
+            raise ThirdPartyUnavailableError(f"Status is not OK: {status} / {response}")
+
         if not 200 <= status < 300:
             raise ThirdPartyTokenVerifyError(f"Status is not OK: {status} / {response}")
 
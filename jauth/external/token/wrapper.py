@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import time
+from typing import Optional
+
+import aiohttp
+import jwt as pyjwt
+
+from jauth.exception.third_party import (
+    ThirdPartyTokenVerifyError,
+    ThirdPartyUnavailableError,
+)
+from jauth.external.token import ThirdPartyUser
+from jauth.util.cache import LruTtlCache
+from jauth.util.circuit_breaker import CircuitBreaker
+from jauth.util.metric import LatencyRecorder
+from jauth.util.single_flight import SingleFlight
+
+
+def token_digest(token: str) -> str:
+    # NOTE: raw third party token is not kept in memory as a key
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def token_expires_in(token: str) -> Optional[float]:
+    # NOTE: id tokens are jwt, opaque access tokens have no expiry to read
+    try:
+        claims = pyjwt.decode(token, verify=False)
+    except pyjwt.PyJWTError:
+        return None
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return None
+    return exp - time.time()
+
+
+class ThirdPartyTokenWrapper:
+    def __init__(self, third_party_token):
+        # third_party_token: object which has `async get_user(token)`
+        self.third_party_token = third_party_token
+
+    async def get_user(self, token) -> ThirdPartyUser:
+        return await self.third_party_token.get_user(token)
+
+
+class CachedThirdPartyToken(ThirdPartyTokenWrapper):
+    def __init__(self, third_party_token, cache: LruTtlCache):
+        super().__init__(third_party_token)
+        self.cache = cache
+
+    async def get_user(self, token) -> ThirdPartyUser:
+        key = token_digest(token)
+        third_party_user = self.cache.get(key)
+        if third_party_user is None:
+            # NOTE: only verified user is cached since failure raises error
+            third_party_user = await super().get_user(token)
+            ttl = self.cache.ttl
+            expires_in = token_expires_in(token)
+            if expires_in is not None:
+                # NOTE: expired token must not be accepted from cache
+                ttl = min(ttl, expires_in)
+            if ttl > 0:
+                self.cache.set(key, third_party_user, ttl=ttl)
+        return third_party_user
+
+
+class CoalescedThirdPartyToken(ThirdPartyTokenWrapper):
+    def __init__(self, third_party_token, single_flight: SingleFlight):
+        super().__init__(third_party_token)
+        self.single_flight = single_flight
+
+    async def get_user(self, token) -> ThirdPartyUser:
+        # NOTE: concurrent requests with same token share one provider call
+        return await self.single_flight.do(
+            token_digest(token), lambda: self.third_party_token.get_user(token)
+        )
+
+
+class GuardedThirdPartyToken(ThirdPartyTokenWrapper):
+    def __init__(
+        self,
+        third_party_token,
+        circuit_breaker: CircuitBreaker,
+        deadline: float = 5,
+        hedge: bool = False,
+        hedge_percentile: float = 95,
+        min_hedge_delay: float = 0.05,
+    ):
+        super().__init__(third_party_token)
+        self.circuit_breaker = circuit_breaker
+        self.deadline = deadline  # seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay  # seconds
+        self.latency = LatencyRecorder()
+        self.hedged = 0
+
+    async def _call(self, token) -> ThirdPartyUser:
+        started_at = time.perf_counter()
+        try:
+            third_party_user = await super().get_user(token)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ThirdPartyUnavailableError(f"request failed: {e!r}")
+        self.latency.record(time.perf_counter() - started_at)
+        return third_party_user
+
+    async def _call_hedged(self, token) -> ThirdPartyUser:
+        hedge_delay = max(
+            self.latency.percentile(self.hedge_percentile), self.min_hedge_delay
+        )
+        pending = {asyncio.ensure_future(self._call(token))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return done.pop().result()
+
+            # NOTE: first call is slower than usual, so race it with second one
+            self.hedged += 1
+            pending.add(asyncio.ensure_future(self._call(token)))
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None or isinstance(error, ThirdPartyTokenVerifyError):
+                        return task.result()
+                if not pending:
+                    return done.pop().result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_user(self, token) -> ThirdPartyUser:
+        self.circuit_breaker.before_call()
+        call = self._call_hedged(token) if self.hedge else self._call(token)
+        started_at = time.perf_counter()
+        try:
+            third_party_user = await asyncio.wait_for(call, timeout=self.deadline)
+        except ThirdPartyTokenVerifyError:
+            # NOTE: invalid token is not a fault of the provider
+            self.circuit_breaker.on_success(time.perf_counter() - started_at)
+            raise
+        except asyncio.TimeoutError:
+            self.circuit_breaker.on_failure()
+            raise ThirdPartyUnavailableError(f"deadline({self.deadline}s) exceeded")
+        except ThirdPartyUnavailableError:
+            self.circuit_breaker.on_failure()
+            raise
+        except asyncio.CancelledError:
+            self.circuit_breaker.on_cancel()
+            raise
+        except Exception:
+            # NOTE: unexpected error (e.g. malformed response) still ends the call,
+            #  otherwise trial slot of half open circuit is never given back
+            self.circuit_breaker.on_failure()
+            raise
+
+        self.circuit_breaker.on_success(time.perf_counter() - started_at)
+        return third_party_user
+
+    def stats(self) -> dict:
+        return {
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "latency": self.latency.to_dict(),
+            "hedged": self.hedged,
+        }
@@ -0,0 +1,196 @@
+import abc
+from typing import List, Optional, Sequence
+
+
+async def fetch_all(connection, query: str, values: Sequence = None) -> list:
+    async with connection.cursor() as cursor:
+        await cursor.execute(query, values)
+        return list(await cursor.fetchall())
+
+
+async def execute(connection, query: str, values: Sequence = None) -> int:
+    async with connection.cursor() as cursor:
+        # returns number of affected rows
+        return await cursor.execute(query, values)
+
+
+async def get_column_type(connection, table: str, column: str) -> Optional[str]:
+    rows = await fetch_all(
+        connection,
+        "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column),
+    )
+    return rows[0][0].lower() if rows else None
+
+
+async def has_index(connection, table: str, columns: List[str]) -> bool:
+    # NOTE: any index starting with given columns serves the lookup whatever its name is
+    rows = await fetch_all(
+        connection,
+        "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+        "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+    )
+    indexes = {}
+    for index_name, column_name in rows:
+        indexes.setdefault(index_name, []).append(column_name)
+    return any(
+        index_columns[: len(columns)] == columns for index_columns in indexes.values()
+    )
+
+
+async def add_index(
+    connection, table: str, name: str, columns: List[str], definition: str = None
+) -> bool:
+    if await has_index(connection, table, columns):
+        return False
+
+    if definition is None:
+        definition = ", ".join(f"`{column}`" for column in columns)
+    # NOTE: online DDL, reads and writes on the table are not blocked while building
+    await execute(
+        connection,
+        f"ALTER TABLE `{table}` ADD INDEX `{name}` ({definition}), "
+        f"ALGORITHM=INPLACE, LOCK=NONE",
+    )
+    return True
+
+
+async def add_column(connection, table: str, column: str, definition: str) -> bool:
+    if await get_column_type(connection, table, column) is not None:
+        return False
+
+    await execute(
+        connection,
+        f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}, "
+        f"ALGORITHM=INPLACE, LOCK=NONE",
+    )
+    return True
+
+
+async def get_primary_key(connection, table: str) -> str:
+    rows = await fetch_all(
+        connection,
+        "SELECT COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = 'PRIMARY' "
+        "ORDER BY SEQ_IN_INDEX",
+        (table,),
+    )
+    if len(rows) != 1:
+        raise RuntimeError(f"{table} has no single column primary key")
+    return rows[0][0]
+
+
+async def backfill_by_primary_key(
+    connection, table: str, assignment: str, batch_size: int = 1000
+):
+    # NOTE: walks primary key by keyset, so each batch reads only its own range
+    #  instead of rescanning rows already updated
+    primary_key = await get_primary_key(connection, table)
+    last_key = None
+    while True:
+        if last_key is None:
+            condition, values = "", (batch_size,)
+        else:
+            condition, values = f"WHERE `{primary_key}` > %s ", (last_key, batch_size)
+        rows = await fetch_all(
+            connection,
+            f"SELECT `{primary_key}` FROM `{table}` {condition}"
+            f"ORDER BY `{primary_key}` LIMIT %s",
+            values,
+        )
+        if not rows:
+            return
+
+        await execute(
+            connection,
+            f"UPDATE `{table}` SET {assignment} "
+            f"WHERE `{primary_key}` >= %s AND `{primary_key}` <= %s",
+            (rows[0][0], rows[-1][0]),
+        )
+        last_key = rows[-1][0]
+
+
+async def convert_uuid_to_binary(
+    connection, table: str, column: str, batch_size: int = 1000
+) -> bool:
+    if await get_column_type(connection, table, column) == "binary":
+        return False
+
+    # NOTE: values are copied to shadow column in small batches to keep each
+    #  statement short, then columns are swapped by single online rebuild
+    shadow = f"{column}_binary"
+    if await get_column_type(connection, table, shadow) is None:
+        await execute(
+            connection,
+            f"ALTER TABLE `{table}` ADD COLUMN `{shadow}` BINARY(16) NULL, "
+            f"ALGORITHM=INPLACE, LOCK=NONE",
+        )
+    await backfill_by_primary_key(
+        connection,
+        table,
+        f"`{shadow}` = UNHEX(REPLACE(`{column}`, '-', ''))",
+        batch_size,
+    )
+
+    rows = await fetch_all(
+        connection,
+        "SELECT IS_NULLABLE FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column),
+    )
+    nullable = "NULL" if rows[0][0] == "YES" else "NOT NULL"
+
+    rows = await fetch_all(
+        connection,
+        "SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME, SUB_PART "
+        "FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+        "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+    )
+    indexes = {}
+    for index_name, non_unique, column_name, sub_part in rows:
+        definition = f"`{column_name}`" + (f"({sub_part})" if sub_part else "")
+        indexes.setdefault(index_name, (non_unique, []))[1].append(
+            (column_name, definition)
+        )
+
+    drops = []
+    adds = []
+    for index_name, (non_unique, index_columns) in indexes.items():
+        if column not in [column_name for column_name, _ in index_columns]:
+            continue
+        definition = ", ".join(
+            f"`{column}`" if column_name == column else column_definition
+            for column_name, column_definition in index_columns
+        )
+        if index_name == "PRIMARY":
+            drops.append("DROP PRIMARY KEY")
+            adds.append(f"ADD PRIMARY KEY ({definition})")
+        else:
+            drops.append(f"DROP INDEX `{index_name}`")
+            unique = "" if non_unique else "UNIQUE "
+            adds.append(f"ADD {unique}INDEX `{index_name}` ({definition})")
+
+    clauses = drops + [
+        f"DROP COLUMN `{column}`",
+        f"CHANGE COLUMN `{shadow}` `{column}` BINARY(16) {nullable}",
+    ]
+    await execute(
+        connection,
+        f"ALTER TABLE `{table}` {', '.join(clauses + adds)}, "
+        f"ALGORITHM=INPLACE, LOCK=NONE",
+    )
+    return True
+
+
+class Migration(abc.ABC):
+    version: int
+    description: str
+
+    @abc.abstractmethod
+    async def apply(self, connection):
+        pass
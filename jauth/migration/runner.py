@@ -0,0 +1,62 @@
+from typing import List
+
+from tortoise import Tortoise
+
+from jauth.migration import Migration, execute, fetch_all
+from jauth.migration.v0001_lookup_index import LookupIndexMigration
+from jauth.migration.v0002_token_created_at_index import TokenCreatedAtIndexMigration
+from jauth.migration.v0003_binary_uuid import BinaryUUIDMigration
+from jauth.migration.v0004_user_event_delivery import UserEventDeliveryMigration
+from jauth.util.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATIONS: List[Migration] = [
+    LookupIndexMigration(),
+    TokenCreatedAtIndexMigration(),
+    BinaryUUIDMigration(),
+    UserEventDeliveryMigration(),
+]
+
+LOCK_NAME = "jauth_migration"
+
+
+async def _apply_migrations(connection):
+    await execute(
+        connection,
+        "CREATE TABLE IF NOT EXISTS `schema_version` ("
+        "`version` INT NOT NULL PRIMARY KEY, "
+        "`description` VARCHAR(255) NOT NULL, "
+        "`applied_at` DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6))",
+    )
+    rows = await fetch_all(connection, "SELECT `version` FROM `schema_version`")
+    applied_versions = {row[0] for row in rows}
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied_versions:
+            continue
+
+        logger.info(f"Apply migration {migration.version}: {migration.description}")
+        # NOTE: migrations are written idempotent since DDL can't be rolled back
+        await migration.apply(connection)
+        await execute(
+            connection,
+            "INSERT INTO `schema_version` (`version`, `description`) VALUES (%s, %s)",
+            (migration.version, migration.description),
+        )
+
+
+async def run_migrations(connection_name: str = "default", lock_timeout: int = 600):
+    client = Tortoise.get_connection(connection_name)
+    async with client.acquire_connection() as connection:
+        # NOTE: named lock is held by session, so every statement runs on this connection
+        rows = await fetch_all(
+            connection, "SELECT GET_LOCK(%s, %s)", (LOCK_NAME, lock_timeout)
+        )
+        if rows[0][0] != 1:
+            raise RuntimeError(f"could not get {LOCK_NAME} lock in {lock_timeout}s")
+
+        try:
+            await _apply_migrations(connection)
+        finally:
+            await execute(connection, "SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
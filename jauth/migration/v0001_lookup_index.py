@@ -0,0 +1,31 @@
+from jauth.migration import Migration, add_index, get_column_type
+
+
+class LookupIndexMigration(Migration):
+    version = 1
+    description = "add indexes for user and token lookups"
+
+    async def apply(self, connection):
+        if await get_column_type(connection, "user", "third_party_user_id") == "text":
+            # NOTE: converting TEXT column to VARCHAR copies whole table,
+            #  so existing table gets prefix index instead which is built online
+            third_party_definition = "`third_party_user_id`(191), `type`, `status`"
+        else:
+            third_party_definition = None
+
+        await add_index(
+            connection,
+            table="user",
+            name="idx_user_third_party_user_id_type_status",
+            columns=["third_party_user_id", "type", "status"],
+            definition=third_party_definition,
+        )
+        await add_index(
+            connection, table="user", name="idx_user_account", columns=["account"]
+        )
+        await add_index(
+            connection, table="user", name="idx_user_email", columns=["email"]
+        )
+        await add_index(
+            connection, table="token", name="idx_token_user_id", columns=["user_id"]
+        )
@@ -0,0 +1,14 @@
+from jauth.migration import Migration, add_index
+
+
+class TokenCreatedAtIndexMigration(Migration):
+    version = 2
+    description = "add index for sweeping expired tokens"
+
+    async def apply(self, connection):
+        await add_index(
+            connection,
+            table="token",
+            name="idx_token_created_at",
+            columns=["created_at"],
+        )
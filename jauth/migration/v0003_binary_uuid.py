@@ -0,0 +1,16 @@
+from jauth.migration import Migration, convert_uuid_to_binary
+
+
+class BinaryUUIDMigration(Migration):
+    version = 3
+    description = "store uuid columns of user and token as BINARY(16)"
+
+    async def apply(self, connection):
+        # NOTE: user_extra.user_id is compared with user.id in search subquery
+        for table, column in [
+            ("user", "id"),
+            ("user_extra", "user_id"),
+            ("token", "id"),
+            ("token", "user_id"),
+        ]:
+            await convert_uuid_to_binary(connection, table, column)
@@ -0,0 +1,10 @@
+from jauth.migration import Migration, add_column
+
+
+class UserEventDeliveryMigration(Migration):
+    version = 4
+    description = "add lease id and delivered urls to user_event"
+
+    async def apply(self, connection):
+        await add_column(connection, "user_event", "lock_id", "CHAR(36) NULL")
+        await add_column(connection, "user_event", "delivered_urls", "JSON NULL")
@@ -1,14 +1,16 @@
 from uuid import UUID
 
-from tortoise import fields
 from tortoise.models import Model
 
+from jauth.model.field import BinaryUUIDField
 from jauth.model.mixin import TimestampMixin
+from jauth.util.uuid import uuid7
 
 
 class Token(Model, TimestampMixin):
     class Meta:
         table = "token"
+        indexes = (("created_at",),)
 
-    id: UUID = fields.UUIDField(pk=True)
-    user_id: UUID = fields.UUIDField()
+    id: UUID = BinaryUUIDField(pk=True, default=uuid7)
+    user_id: UUID = BinaryUUIDField(index=True)
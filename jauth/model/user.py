@@ -4,7 +4,9 @@ from uuid import UUID
 from tortoise import fields
 from tortoise.models import Model
 
+from jauth.model.field import BinaryUUIDField
 from jauth.model.mixin import TimestampMixin
+from jauth.util.uuid import uuid7
 
 
 class UserType(enum.IntEnum):
@@ -25,12 +27,13 @@ class UserStatus(enum.IntEnum):
 class User(Model, TimestampMixin):
     class Meta:
         table = "user"
+        indexes = (("third_party_user_id", "type", "status"),)
 
-    id: UUID = fields.UUIDField(pk=True)
-    email = fields.CharField(max_length=255)
-    account = fields.CharField(max_length=64, null=True)
+    id: UUID = BinaryUUIDField(pk=True, default=uuid7)
+    email = fields.CharField(max_length=255, index=True)
+    account = fields.CharField(max_length=64, null=True, index=True)
     hashed_password = fields.CharField(max_length=64, null=True)
-    third_party_user_id = fields.TextField(null=True)
+    third_party_user_id = fields.CharField(max_length=255, null=True)
     type = fields.IntEnumField(UserType)
     status = fields.IntEnumField(UserStatus, default=UserStatus.NORMAL)
     is_email_verified = fields.BooleanField(default=False)
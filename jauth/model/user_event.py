@@ -0,0 +1,39 @@
+import enum
+from uuid import UUID
+
+from tortoise import fields
+from tortoise.models import Model
+
+from jauth.model.mixin import TimestampMixin
+
+
+class UserEventType(str, enum.Enum):
+    CREATION = "jauth.user.create"
+    UPDATE = "jauth.user.update"
+
+
+class UserEventStatus(enum.IntEnum):
+    PENDING = 0
+    DELIVERED = 1
+    FAILED = 2
+
+
+class UserEvent(Model, TimestampMixin):
+    class Meta:
+        table = "user_event"
+        indexes = (("status", "id"), ("user_id", "status"))
+
+    id = fields.BigIntField(pk=True)
+    user_id: UUID = fields.UUIDField()
+    type = fields.CharEnumField(UserEventType, max_length=64)
+    payload = fields.JSONField()
+    status = fields.IntEnumField(UserEventStatus, default=UserEventStatus.PENDING)
+    attempts = fields.IntField(default=0)
+    next_attempt_at = fields.DatetimeField()
+    # NOTE: dispatcher which claimed the event owns it until then
+    locked_until = fields.DatetimeField(null=True)
+    # NOTE: changed by every claim, so dispatcher whose lease was taken over can't mark it
+    lock_id: UUID = fields.UUIDField(null=True)
+    # NOTE: callback urls already responded 2xx, skipped on retry
+    delivered_urls = fields.JSONField(null=True)
+    last_error = fields.TextField(null=True)
@@ -0,0 +1,19 @@
+from uuid import UUID
+
+from tortoise import fields
+from tortoise.models import Model
+
+from jauth.model.field import BinaryUUIDField
+
+
+class UserExtra(Model):
+    # NOTE: indexed copy of configured keys of User.extra for searching,
+    #  list value is stored as a row per element
+    class Meta:
+        table = "user_extra"
+        indexes = (("key", "value", "user_id"),)
+
+    id = fields.BigIntField(pk=True)
+    user_id: UUID = BinaryUUIDField(index=True)
+    key = fields.CharField(max_length=64)
+    value = fields.CharField(max_length=255)
@@ -1,9 +1,21 @@
-import abc
+import datetime
+import uuid
+from typing import Optional
 
 from tortoise.queryset import QuerySet
 
 from jauth.model.token import Token
 from jauth.repository.token_base import TokenRepository
+from jauth.structure.record import TokenRecord
+from jauth.util.batch_writer import BatchWriter
+from jauth.util.replica import ReplicaRouter, route_read
+
+
+def _normalize_token_id(_id: str) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(_id)))
+    except ValueError:
+        return None
 
 
 def _token_relational_query_set(query_set: QuerySet[Token]) -> QuerySet[Token]:
@@ -11,15 +23,76 @@ def _token_relational_query_set(query_set: QuerySet[Token]) -> QuerySet[Token]:
 
 
 class TokenRepositoryImpl(TokenRepository):
+    def __init__(
+        self,
+        replica_router: ReplicaRouter = None,
+        token_writer: BatchWriter[Token] = None,
+    ):
+        # NOTE: reads go to primary if not set
+        self.replica_router = replica_router
+        # NOTE: concurrent creations are inserted by one statement if set
+        self.token_writer = token_writer
+
     async def find_token_by_id(self, _id: str) -> Token:
-        return await _token_relational_query_set(
-            Token.filter(id=_id).order_by("modified_at", "created_at")
-        ).first()
+        _id = _normalize_token_id(_id)
+        if _id is None:
+            return None
+
+        # NOTE: token created just before may not be replicated yet
+        return await route_read(
+            self.replica_router,
+            lambda db: _token_relational_query_set(Token.filter(id=_id))
+            .using_db(db)
+            .first(),
+            fallback_on_empty=True,
+        )
+
+    async def find_token_record_by_id(
+        self, _id: str, created_after: datetime.datetime = None
+    ) -> Optional[TokenRecord]:
+        _id = _normalize_token_id(_id)
+        if _id is None:
+            # NOTE: malformed token can't be converted to binary id
+            return None
+
+        query_set = Token.filter(id=_id)
+        if created_after is not None:
+            query_set = query_set.filter(created_at__gte=created_after)
+
+        rows = await route_read(
+            self.replica_router,
+            lambda db: query_set.using_db(db)
+            .limit(1)
+            .values_list("id", "user_id", "created_at"),
+            fallback_on_empty=True,
+        )
+        if not rows:
+            return None
+        _id, user_id, created_at = rows[0]
+        return TokenRecord(id=str(_id), user_id=str(user_id), created_at=created_at)
 
     async def create_token(self, user_id: str) -> Token:
-        return await Token.create(user_id=user_id)
+        if self.token_writer is None:
+            return await Token.create(user_id=user_id)
+
+        token = Token(user_id=user_id)
+        await self.token_writer.write(token)
+        return token
 
     async def delete_token(self, token_id: str) -> int:
-        return await _token_relational_query_set(
-            Token.filter(id=token_id).order_by("modified_at", "created_at")
-        ).delete()
+        token_id = _normalize_token_id(token_id)
+        if token_id is None:
+            return 0
+        return await _token_relational_query_set(Token.filter(id=token_id)).delete()
+
+    async def delete_expired_tokens(
+        self, created_before: datetime.datetime, limit: int
+    ) -> int:
+        token_ids = (
+            await Token.filter(created_at__lt=created_before)
+            .limit(limit)
+            .values_list("id", flat=True)
+        )
+        if not token_ids:
+            return 0
+        return await Token.filter(id__in=token_ids).delete()
@@ -1,7 +1,10 @@
 import abc
+import datetime
+from typing import Optional
 
 from jauth.model.token import Token
 from jauth.repository import BaseRepository
+from jauth.structure.record import TokenRecord
 
 
 class TokenRepository(BaseRepository, abc.ABC):
@@ -9,6 +12,12 @@ class TokenRepository(BaseRepository, abc.ABC):
     async def find_token_by_id(self, _id: str) -> Token:
         pass
 
+    @abc.abstractmethod
+    async def find_token_record_by_id(
+        self, _id: str, created_after: datetime.datetime = None
+    ) -> Optional[TokenRecord]:
+        pass
+
     @abc.abstractmethod
     async def create_token(self, user_id: str) -> Token:
         pass
@@ -16,3 +25,9 @@ class TokenRepository(BaseRepository, abc.ABC):
     @abc.abstractmethod
     async def delete_token(self, token_id: str) -> int:
         pass
+
+    @abc.abstractmethod
+    async def delete_expired_tokens(
+        self, created_before: datetime.datetime, limit: int
+    ) -> int:
+        pass
@@ -0,0 +1,60 @@
+import collections
+import datetime
+from typing import Dict, Optional
+
+from jauth.model.token import Token
+from jauth.repository.token_base import TokenRepository
+from jauth.structure.record import TokenRecord
+from jauth.util.util import utc_now
+from jauth.util.uuid import uuid7
+
+
+class InMemoryTokenRepositoryImpl(TokenRepository):
+    # NOTE: tokens are neither persisted nor shared between processes,
+    #  so it is only for tests (not selectable by config)
+    def __init__(self):
+        # NOTE: insertion order is creation order, so expired tokens are at front
+        self._tokens: Dict[str, TokenRecord] = collections.OrderedDict()
+
+    def _find(
+        self, _id: str, created_after: datetime.datetime = None
+    ) -> Optional[TokenRecord]:
+        record = self._tokens.get(str(_id))
+        if record is None:
+            return None
+        if created_after is not None and record.created_at < created_after:
+            return None
+        return record
+
+    async def find_token_by_id(self, _id: str) -> Optional[Token]:
+        record = self._find(_id)
+        if record is None:
+            return None
+        return Token(id=record.id, user_id=record.user_id, created_at=record.created_at)
+
+    async def find_token_record_by_id(
+        self, _id: str, created_after: datetime.datetime = None
+    ) -> Optional[TokenRecord]:
+        return self._find(_id, created_after)
+
+    async def create_token(self, user_id: str) -> Token:
+        record = TokenRecord(
+            id=str(uuid7()), user_id=str(user_id), created_at=utc_now()
+        )
+        self._tokens[record.id] = record
+        return Token(id=record.id, user_id=record.user_id, created_at=record.created_at)
+
+    async def delete_token(self, token_id: str) -> int:
+        return 1 if self._tokens.pop(str(token_id), None) else 0
+
+    async def delete_expired_tokens(
+        self, created_before: datetime.datetime, limit: int
+    ) -> int:
+        deleted = 0
+        while self._tokens and deleted < limit:
+            token_id, record = next(iter(self._tokens.items()))
+            if record.created_at >= created_before:
+                break
+            del self._tokens[token_id]
+            deleted += 1
+        return deleted
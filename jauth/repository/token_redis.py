@@ -0,0 +1,62 @@
+import datetime
+from typing import Optional
+
+import aioredis
+
+from jauth.model.token import Token
+from jauth.repository.token_base import TokenRepository
+from jauth.structure.record import TokenRecord
+from jauth.util.util import utc_now
+from jauth.util.uuid import uuid7
+
+
+class RedisTokenRepositoryImpl(TokenRepository):
+    def __init__(self, url: str, ttl: int, key_prefix: str = "jauth:token:"):
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self.ttl = ttl  # seconds, expired tokens are evicted by redis
+        self.key_prefix = key_prefix
+
+    def _key(self, token_id: str) -> str:
+        return f"{self.key_prefix}{token_id}"
+
+    async def find_token_by_id(self, _id: str) -> Optional[Token]:
+        record = await self.find_token_record_by_id(_id)
+        if record is None:
+            return None
+        return Token(id=record.id, user_id=record.user_id, created_at=record.created_at)
+
+    async def find_token_record_by_id(
+        self, _id: str, created_after: datetime.datetime = None
+    ) -> Optional[TokenRecord]:
+        value = await self.redis.get(self._key(_id))
+        if value is None:
+            return None
+
+        # e.g) {user_id}|{created_at timestamp}
+        user_id, created_at = value.split("|")
+        created_at = datetime.datetime.fromtimestamp(
+            float(created_at), tz=datetime.timezone.utc
+        )
+        if created_after is not None and created_at < created_after:
+            return None
+        return TokenRecord(id=str(_id), user_id=user_id, created_at=created_at)
+
+    async def create_token(self, user_id: str) -> Token:
+        token_id = str(uuid7())
+        created_at = utc_now()
+        await self.redis.set(
+            self._key(token_id), f"{user_id}|{created_at.timestamp()}", ex=self.ttl
+        )
+        return Token(id=token_id, user_id=str(user_id), created_at=created_at)
+
+    async def delete_token(self, token_id: str) -> int:
+        return await self.redis.delete(self._key(token_id))
+
+    async def delete_expired_tokens(
+        self, created_before: datetime.datetime, limit: int
+    ) -> int:
+        # NOTE: nothing to sweep since keys expire by ttl
+        return 0
+
+    async def close(self):
+        await self.redis.close()
@@ -1,12 +1,22 @@
-from typing import List, Tuple
+import asyncio
+import contextlib
+import contextvars
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
 
-from tortoise import Tortoise
-from tortoise.query_utils import Q
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
 from tortoise.queryset import QuerySet
 
 from jauth.model.user import User, UserType, UserStatus
+from jauth.model.user_extra import UserExtra
 from jauth.repository.user_base import UserRepository
+from jauth.repository.user_query import UserSearchQueryBuilder, extra_values_to_str
+from jauth.structure.cursor import TotalMode, UserCursor
 from jauth.structure.datetime_range import DatetimeRange
+from jauth.structure.record import UserIdentity, UserRecord
+from jauth.util.cache import LruTtlCache
+from jauth.util.replica import ReplicaRouter, get_primary, route_read
 
 
 def user_model_to_dict(row: User):
@@ -34,11 +44,226 @@ def _user_relational_query_set(query_set: QuerySet[User]) -> QuerySet[User]:
     return query_set
 
 
+async def _count(
+    db: BaseDBAsyncClient, query_set: QuerySet[User], total_mode: TotalMode
+) -> Optional[int]:
+    if total_mode == TotalMode.SKIP:
+        return None
+
+    if total_mode == TotalMode.EXACT:
+        return await query_set.using_db(db).count()
+
+    # NOTE: optimizer's estimate from index statistics, no rows are scanned
+    rows = await db.execute_query_dict(f"EXPLAIN {query_set.sql()}")
+    if not rows:
+        return 0
+    return int((rows[0].get("rows") or 0) * float(rows[0].get("filtered") or 100) / 100)
+
+
+def normalize_user_id(_id: str) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(_id)))
+    except ValueError:
+        return None
+
+
+# NOTE: ids of users written in current repository transaction
+_written_user_ids: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar(
+    "written_user_ids", default=None
+)
+
+
 class UserRepositoryImpl(UserRepository):
-    async def find_user_by_id(self, _id: str) -> User:
-        return await _user_relational_query_set(
-            User.filter(id=_id).order_by("modified_at", "created_at")
-        ).first()
+    def __init__(
+        self,
+        indexed_extra_keys: List[str] = (),
+        replica_router: ReplicaRouter = None,
+        user_cache: LruTtlCache = None,
+        not_found_cache: LruTtlCache = None,
+    ):
+        self.indexed_extra_keys = list(indexed_extra_keys)
+        # NOTE: reads go to primary if not set
+        self.replica_router = replica_router
+        # NOTE: user id to UserRecord, only writes of this process invalidate it
+        #  so ttl bounds staleness from other processes
+        self.user_cache = user_cache
+        # NOTE: user ids confirmed missing on primary
+        self.not_found_cache = not_found_cache
+        self._cache_generation = 0
+
+    def _invalidate(self, user_id: str):
+        if self.user_cache is not None:
+            self.user_cache.delete(str(user_id))
+        if self.not_found_cache is not None:
+            self.not_found_cache.delete(str(user_id))
+        # NOTE: keeps result of read started before this point out of cache
+        self._cache_generation += 1
+
+    def _record_write(self, user_id: str):
+        # NOTE: called before write
+        if self.replica_router:
+            self.replica_router.record_write(user_id)
+        self._invalidate(user_id)
+
+    def _record_written(self, user_id: str):
+        # NOTE: called after write, read between invalidation and commit
+        #  may have cached old row, so it is invalidated again once committed
+        written_user_ids = _written_user_ids.get()
+        if written_user_ids is None:
+            self._invalidate(user_id)
+        else:
+            written_user_ids.add(str(user_id))
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        if _written_user_ids.get() is not None:
+            # NOTE: nested one is committed with outermost transaction
+            async with in_transaction("default") as connection:
+                yield connection
+            return
+
+        written_user_ids = set()
+        token = _written_user_ids.set(written_user_ids)
+        try:
+            async with in_transaction("default") as connection:
+                yield connection
+        finally:
+            _written_user_ids.reset(token)
+            for user_id in written_user_ids:
+                self._invalidate(user_id)
+
+    async def _index_extra(self, user_id: str, extra: dict, replace: bool):
+        if not self.indexed_extra_keys:
+            return
+
+        if replace:
+            await UserExtra.filter(user_id=user_id).delete()
+
+        rows = [
+            UserExtra(user_id=user_id, key=key, value=value)
+            for key in self.indexed_extra_keys
+            if key in extra
+            for value in extra_values_to_str(extra[key])
+        ]
+        if rows:
+            await UserExtra.bulk_create(rows)
+
+    async def find_user_by_id(
+        self, _id: str, from_primary: bool = False
+    ) -> Optional[UserRecord]:
+        _id = normalize_user_id(_id)
+        if _id is None:
+            # NOTE: malformed id never matches, so database is not queried
+            return None
+
+        if from_primary:
+            # NOTE: cache and replicas may miss writes made through other workers
+            user = (
+                await _user_relational_query_set(User.filter(id=_id))
+                .using_db(get_primary())
+                .first()
+            )
+            return UserRecord.from_model(user) if user else None
+
+        if self.user_cache is not None:
+            record = self.user_cache.get(_id)
+            if record is not None:
+                return record.copy()
+
+        if self.not_found_cache is not None and self.not_found_cache.get(_id):
+            return None
+
+        generation = self._cache_generation
+        user = await route_read(
+            self.replica_router,
+            lambda db: _user_relational_query_set(User.filter(id=_id))
+            .using_db(db)
+            .first(),
+            user_id=_id,
+            fallback_on_empty=True,
+        )
+        if not user:
+            if (
+                self.not_found_cache is not None
+                and generation == self._cache_generation
+            ):
+                self.not_found_cache.set(_id, True)
+            return None
+
+        record = UserRecord.from_model(user)
+        if self.user_cache is not None and generation == self._cache_generation:
+            self.user_cache.set(_id, record)
+            return record.copy()
+        return record
+
+    async def find_users_by_ids(self, ids: List[str]) -> Dict[str, UserRecord]:
+        records = {}
+        missing_ids = []
+        # NOTE: dict keeps order of first occurrence while removing duplicates
+        for _id in dict.fromkeys(filter(None, map(normalize_user_id, ids))):
+            record = None
+            if self.user_cache is not None:
+                record = self.user_cache.get(_id)
+            if record is not None:
+                records[_id] = record.copy()
+            elif self.not_found_cache is None or not self.not_found_cache.get(_id):
+                missing_ids.append(_id)
+
+        if not missing_ids:
+            return records
+
+        generation = self._cache_generation
+        users = await route_read(
+            self.replica_router,
+            lambda db: _user_relational_query_set(User.filter(id__in=missing_ids))
+            .using_db(db)
+            .all(),
+        )
+        if self.replica_router and len(users) < len(missing_ids):
+            # NOTE: users created recently may not be replicated yet
+            found_ids = {str(user.id) for user in users}
+            users += await _user_relational_query_set(
+                User.filter(id__in=[_id for _id in missing_ids if _id not in found_ids])
+            ).using_db(get_primary())
+
+        is_cacheable = generation == self._cache_generation
+        for user in users:
+            record = UserRecord.from_model(user)
+            records[str(user.id)] = record
+            if self.user_cache is not None and is_cacheable:
+                self.user_cache.set(str(user.id), record)
+                records[str(user.id)] = record.copy()
+        if self.not_found_cache is not None and is_cacheable:
+            for _id in missing_ids:
+                if _id not in records:
+                    self.not_found_cache.set(_id, True)
+        return records
+
+    async def find_user_identity_by_id(self, _id: str) -> Optional[UserIdentity]:
+        _id = normalize_user_id(_id)
+        if _id is None:
+            return None
+
+        if self.user_cache is not None:
+            record = self.user_cache.get(str(_id))
+            if record is not None:
+                return UserIdentity(
+                    id=str(record.id), type=record.type, status=record.status
+                )
+
+        rows = await route_read(
+            self.replica_router,
+            lambda db: User.filter(id=_id)
+            .using_db(db)
+            .limit(1)
+            .values_list("id", "type", "status"),
+            user_id=_id,
+            fallback_on_empty=True,
+        )
+        if not rows:
+            return None
+        _id, user_type, status = rows[0]
+        return UserIdentity(id=str(_id), type=user_type, status=status)
 
     async def find_user_by_account(self, account: str) -> User:
         return await _user_relational_query_set(User.filter(account=account)).first()
@@ -54,62 +279,104 @@ class UserRepositoryImpl(UserRepository):
             )
         ).first()
 
+    def _search_query_sets(
+        self,
+        emails: List[str] = (),
+        created_at_range: DatetimeRange = None,
+        modified_at_range: DatetimeRange = None,
+        extra_text: List[str] = (),
+        extra_filters: Dict[str, list] = None,
+        order_bys: List[str] = (),
+        status: List[int] = (),
+        types: List[int] = (),
+        after: UserCursor = None,
+    ) -> Tuple[QuerySet[User], QuerySet[User]]:
+        return (
+            UserSearchQueryBuilder(indexed_extra_keys=self.indexed_extra_keys)
+            .emails(emails)
+            .created_at_range(created_at_range)
+            .modified_at_range(modified_at_range)
+            .extra_text(extra_text)
+            .extra_filters(extra_filters)
+            .order_by(order_bys)
+            .status(status)
+            .types(types)
+            .after(after)
+            .build()
+        )
+
     async def search_users(
         self,
         emails: List[str] = (),
         created_at_range: DatetimeRange = None,
         modified_at_range: DatetimeRange = None,
         extra_text: List[str] = (),
+        extra_filters: Dict[str, list] = None,
         start: int = 0,
         size: int = 10,
         order_bys: List[str] = (),
         status: List[int] = (),
         types: List[int] = (),
-    ) -> Tuple[int, List[User]]:
-        if not status:
-            status = [UserStatus.NORMAL]
-        else:
-            status = [UserStatus(e) for e in status]
-
-        filters = []
-        if extra_text:
-            filters.append(
-                Q(*[Q(extra__contains=word) for word in extra_text], join_type="OR")
-            )
-
-        if emails:
-            filters.append(Q(*[Q(email=email) for email in emails], join_type="OR"))
-
-        if created_at_range:
-            filters.append(
-                Q(
-                    created_at__gte=created_at_range.start,
-                    created_at__lte=created_at_range.end,
-                )
-            )
-
-        if modified_at_range:
-            filters.append(
-                Q(
-                    modified_at__gte=modified_at_range.start,
-                    modified_at__lte=modified_at_range.end,
-                )
-            )
+        after: UserCursor = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[Optional[int], List[User]]:
+        query_set, page_query_set = self._search_query_sets(
+            emails=emails,
+            created_at_range=created_at_range,
+            modified_at_range=modified_at_range,
+            extra_text=extra_text,
+            extra_filters=extra_filters,
+            order_bys=order_bys,
+            status=status,
+            types=types,
+            after=after,
+        )
+        if not after:
+            page_query_set = page_query_set.offset(start)
 
-        if types:
-            filters.append(Q(*[Q(type=type_) for type_ in types], join_type="OR"))
+        # NOTE: count and page are fetched on separate connections concurrently
+        total, users = await route_read(
+            self.replica_router,
+            lambda db: asyncio.gather(
+                _count(db, query_set, total_mode),
+                page_query_set.using_db(db).limit(size).all(),
+            ),
+        )
+        return total, users
 
-        query_set = _user_relational_query_set(
-            User.filter(Q(*filters)).filter(status__in=status)
-        ).all()
+    async def explain_search_users(
+        self,
+        emails: List[str] = (),
+        created_at_range: DatetimeRange = None,
+        modified_at_range: DatetimeRange = None,
+        extra_text: List[str] = (),
+        extra_filters: Dict[str, list] = None,
+        order_bys: List[str] = (),
+        status: List[int] = (),
+        types: List[int] = (),
+        after: UserCursor = None,
+        start: int = 0,
+        size: int = 10,
+    ) -> dict:
+        _, page_query_set = self._search_query_sets(
+            emails=emails,
+            created_at_range=created_at_range,
+            modified_at_range=modified_at_range,
+            extra_text=extra_text,
+            extra_filters=extra_filters,
+            order_bys=order_bys,
+            status=status,
+            types=types,
+            after=after,
+        )
+        if not after:
+            page_query_set = page_query_set.offset(start)
 
-        for order_by in order_bys:
-            if order_by.isascii():
-                query_set = query_set.order_by(order_by)
-        return (
-            await query_set.count(),
-            await query_set.offset(start).limit(size).all(),
+        sql = page_query_set.limit(size).sql()
+        explain = await route_read(
+            self.replica_router, lambda db: db.execute_query_dict(f"EXPLAIN {sql}")
         )
+        return {"sql": sql, "explain": explain}
 
     async def create_user(
         self,
@@ -123,14 +390,52 @@ class UserRepositoryImpl(UserRepository):
         if extra is None:
             extra = {}
 
-        return await User.create(
-            type=user_type,
-            account=account,
-            email=email,
-            hashed_password=hashed_password,
-            third_party_user_id=third_party_user_id,
-            extra=extra,
-        )
+        async with self.transaction():
+            user = await User.create(
+                type=user_type,
+                account=account,
+                email=email,
+                hashed_password=hashed_password,
+                third_party_user_id=third_party_user_id,
+                extra=extra,
+            )
+            await self._index_extra(user.id, extra, replace=False)
+        self._record_write(user.id)
+        self._record_written(user.id)
+        return user
 
     async def update_user(self, user_id: str, **kwargs) -> int:
-        return await User.filter(id=user_id).update(**kwargs)
+        self._record_write(user_id)
+        if "extra" not in kwargs or not self.indexed_extra_keys:
+            affected_rows = await User.filter(id=user_id).update(**kwargs)
+        else:
+            async with self.transaction():
+                affected_rows = await User.filter(id=user_id).update(**kwargs)
+                await self._index_extra(user_id, kwargs["extra"], replace=True)
+        self._record_written(user_id)
+        return affected_rows
+
+    async def reindex_user_extra(
+        self, after_id: Optional[str], limit: int
+    ) -> Optional[str]:
+        # NOTE: for backfilling side table when indexed keys are changed
+        query_set = User.all().order_by("id").limit(limit)
+        if after_id:
+            query_set = query_set.filter(id__gt=after_id)
+
+        rows = await query_set.values_list("id", "extra")
+        for user_id, extra in rows:
+            async with self.transaction():
+                await self._index_extra(user_id, extra, replace=True)
+        return str(rows[-1][0]) if rows else None
+
+    async def replace_hashed_password(
+        self, user_id: str, original_hashed_password: str, hashed_password: str
+    ) -> int:
+        self._record_write(user_id)
+        # NOTE: compare-and-set for not overwriting password changed meanwhile
+        affected_rows = await User.filter(
+            id=user_id, hashed_password=original_hashed_password
+        ).update(hashed_password=hashed_password)
+        self._record_written(user_id)
+        return affected_rows
@@ -1,14 +1,30 @@
 import abc
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from jauth.model.user import User, UserType
 from jauth.repository import BaseRepository
+from jauth.structure.record import UserIdentity, UserRecord
+from jauth.structure.cursor import TotalMode, UserCursor
 from jauth.structure.datetime_range import DatetimeRange
 
 
 class UserRepository(BaseRepository, abc.ABC):
     @abc.abstractmethod
-    async def find_user_by_id(self, _id: str) -> User:
+    def transaction(self):
+        pass
+
+    @abc.abstractmethod
+    async def find_user_by_id(
+        self, _id: str, from_primary: bool = False
+    ) -> Optional[UserRecord]:
+        pass
+
+    @abc.abstractmethod
+    async def find_users_by_ids(self, ids: List[str]) -> Dict[str, UserRecord]:
+        pass
+
+    @abc.abstractmethod
+    async def find_user_identity_by_id(self, _id: str) -> Optional[UserIdentity]:
         pass
 
     @abc.abstractmethod
@@ -28,12 +44,32 @@ class UserRepository(BaseRepository, abc.ABC):
         created_at_range: DatetimeRange = None,
         modified_at_range: DatetimeRange = None,
         extra_text: List[str] = (),
+        extra_filters: Dict[str, list] = None,
         start: int = 0,
         size: int = 10,
         order_bys: List[str] = (),
         status: List[int] = (),
         types: List[int] = (),
-    ) -> Tuple[int, List[User]]:
+        after: UserCursor = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[Optional[int], List[User]]:
+        pass
+
+    @abc.abstractmethod
+    async def explain_search_users(
+        self,
+        emails: List[str] = (),
+        created_at_range: DatetimeRange = None,
+        modified_at_range: DatetimeRange = None,
+        extra_text: List[str] = (),
+        extra_filters: Dict[str, list] = None,
+        order_bys: List[str] = (),
+        status: List[int] = (),
+        types: List[int] = (),
+        after: UserCursor = None,
+        start: int = 0,
+        size: int = 10,
+    ) -> dict:
         pass
 
     @abc.abstractmethod
@@ -51,3 +87,15 @@ class UserRepository(BaseRepository, abc.ABC):
     @abc.abstractmethod
     async def update_user(self, user_id: str, **kwargs) -> int:
         pass
+
+    @abc.abstractmethod
+    async def reindex_user_extra(
+        self, after_id: Optional[str], limit: int
+    ) -> Optional[str]:
+        pass
+
+    @abc.abstractmethod
+    async def replace_hashed_password(
+        self, user_id: str, original_hashed_password: str, hashed_password: str
+    ) -> int:
+        pass
@@ -0,0 +1,104 @@
+import datetime
+import uuid
+from typing import List
+
+from tortoise.expressions import Subquery
+from tortoise.functions import Min
+from tortoise.query_utils import Q
+
+from jauth.model.user_event import UserEvent, UserEventStatus, UserEventType
+from jauth.repository.user_event_base import UserEventRepository
+from jauth.util.util import utc_now
+
+
+class UserEventRepositoryImpl(UserEventRepository):
+    async def create_user_event(
+        self, user_id: str, event_type: UserEventType, payload: dict
+    ) -> UserEvent:
+        return await UserEvent.create(
+            user_id=user_id,
+            type=event_type,
+            payload=payload,
+            next_attempt_at=utc_now(),
+        )
+
+    async def claim_pending_events(
+        self, limit: int, lease_seconds: int
+    ) -> List[UserEvent]:
+        now = utc_now()
+        unlocked = Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+        # NOTE: only the oldest pending event of a user is dispatched for ordering,
+        #  so events of other users are claimed while it is backing off
+        oldest_event_ids = Subquery(
+            UserEvent.filter(status=UserEventStatus.PENDING)
+            .annotate(oldest_id=Min("id"))
+            .group_by("user_id")
+            .values("oldest_id")
+        )
+        event_ids = (
+            await UserEvent.filter(
+                unlocked,
+                id__in=oldest_event_ids,
+                status=UserEventStatus.PENDING,
+                next_attempt_at__lte=now,
+            )
+            .order_by("id")
+            .limit(limit)
+            .values_list("id", flat=True)
+        )
+        if not event_ids:
+            return []
+
+        # NOTE: events claimed by another dispatcher in the meantime are skipped
+        lock_id = uuid.uuid4()
+        await UserEvent.filter(
+            unlocked, id__in=event_ids, status=UserEventStatus.PENDING
+        ).update(
+            lock_id=lock_id,
+            locked_until=now + datetime.timedelta(seconds=lease_seconds),
+        )
+        return await UserEvent.filter(lock_id=lock_id).order_by("id")
+
+    async def mark_delivered(self, event: UserEvent, attempts: int) -> int:
+        return await UserEvent.filter(id=event.id, lock_id=event.lock_id).update(
+            status=UserEventStatus.DELIVERED,
+            attempts=attempts,
+            locked_until=None,
+            lock_id=None,
+            last_error=None,
+            modified_at=utc_now(),
+        )
+
+    async def mark_failed(
+        self,
+        event: UserEvent,
+        attempts: int,
+        error: str,
+        next_attempt_at: datetime.datetime,
+        give_up: bool,
+        delivered_urls: List[str],
+    ) -> int:
+        return await UserEvent.filter(id=event.id, lock_id=event.lock_id).update(
+            status=UserEventStatus.FAILED if give_up else UserEventStatus.PENDING,
+            attempts=attempts,
+            last_error=error,
+            next_attempt_at=next_attempt_at,
+            delivered_urls=delivered_urls,
+            locked_until=None,
+            lock_id=None,
+            modified_at=utc_now(),
+        )
+
+    async def delete_delivered_events(
+        self, delivered_before: datetime.datetime, limit: int
+    ) -> int:
+        event_ids = (
+            await UserEvent.filter(
+                status=UserEventStatus.DELIVERED, modified_at__lt=delivered_before
+            )
+            .limit(limit)
+            .values_list("id", flat=True)
+        )
+        if not event_ids:
+            return 0
+        return await UserEvent.filter(id__in=event_ids).delete()
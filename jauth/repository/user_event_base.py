@@ -0,0 +1,42 @@
+import abc
+import datetime
+from typing import List
+
+from jauth.model.user_event import UserEvent, UserEventType
+from jauth.repository import BaseRepository
+
+
+class UserEventRepository(BaseRepository, abc.ABC):
+    @abc.abstractmethod
+    async def create_user_event(
+        self, user_id: str, event_type: UserEventType, payload: dict
+    ) -> UserEvent:
+        pass
+
+    @abc.abstractmethod
+    async def claim_pending_events(
+        self, limit: int, lease_seconds: int
+    ) -> List[UserEvent]:
+        pass
+
+    @abc.abstractmethod
+    async def mark_delivered(self, event: UserEvent, attempts: int) -> int:
+        pass
+
+    @abc.abstractmethod
+    async def mark_failed(
+        self,
+        event: UserEvent,
+        attempts: int,
+        error: str,
+        next_attempt_at: datetime.datetime,
+        give_up: bool,
+        delivered_urls: List[str],
+    ) -> int:
+        pass
+
+    @abc.abstractmethod
+    async def delete_delivered_events(
+        self, delivered_before: datetime.datetime, limit: int
+    ) -> int:
+        pass
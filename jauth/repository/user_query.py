@@ -0,0 +1,148 @@
+import enum
+import json
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
+
+from tortoise.expressions import Subquery
+from tortoise.query_utils import Q
+from tortoise.queryset import QuerySet
+
+from jauth.exception.request import InvalidFilterError, UnindexedExtraKeyError
+from jauth.model.user import User, UserStatus, UserType
+from jauth.model.user_extra import UserExtra
+from jauth.structure.cursor import UserCursor
+from jauth.structure.datetime_range import DatetimeRange
+
+E = TypeVar("E", bound=enum.Enum)
+
+
+def to_enums(enum_class: Type[E], values: list, name: str) -> List[E]:
+    try:
+        return [enum_class(value) for value in values]
+    except ValueError as e:
+        raise InvalidFilterError(f"invalid {name}: {e}")
+
+
+def extra_value_to_str(value) -> Optional[str]:
+    # NOTE: only scalar values are indexed, nested object is skipped
+    if isinstance(value, str):
+        return value if len(value) <= 255 else None
+    if isinstance(value, (bool, int, float)):
+        return json.dumps(value)
+    return None
+
+
+def extra_values_to_str(values) -> List[str]:
+    if not isinstance(values, list):
+        values = [values]
+    values = [extra_value_to_str(value) for value in values]
+    return [value for value in values if value is not None]
+
+
+def keyset_filter(cursor: UserCursor) -> Q:
+    field = cursor.field
+    op = "lt" if cursor.descending else "gt"
+    if field == "id":
+        return Q(**{f"id__{op}": cursor.id})
+
+    # NOTE: NULL comes first in ascending order and last in descending order of MySQL
+    if cursor.value is None:
+        same_value = Q(**{f"{field}__isnull": True, f"id__{op}": cursor.id})
+        if cursor.descending:
+            return same_value
+        return Q(same_value, Q(**{f"{field}__isnull": False}), join_type="OR")
+
+    after = Q(
+        Q(**{f"{field}__{op}": cursor.value}),
+        Q(**{field: cursor.value, f"id__{op}": cursor.id}),
+        join_type="OR",
+    )
+    if cursor.descending:
+        return Q(after, Q(**{f"{field}__isnull": True}), join_type="OR")
+    return after
+
+
+class UserSearchQueryBuilder:
+    # NOTE: every filter is emitted as IN list or plain range on column
+    #  so that MySQL can use indexes (no OR tree of equality predicates)
+    def __init__(self, indexed_extra_keys: List[str] = ()):
+        self.indexed_extra_keys = indexed_extra_keys
+        self._filters: List[Q] = []
+        self._status = [UserStatus.NORMAL]
+        self._order_bys: List[str] = []
+        self._after: Optional[UserCursor] = None
+
+    def emails(self, emails: List[str]) -> "UserSearchQueryBuilder":
+        if emails:
+            self._filters.append(Q(email__in=list(emails)))
+        return self
+
+    def types(self, types: List[int]) -> "UserSearchQueryBuilder":
+        if types:
+            self._filters.append(Q(type__in=to_enums(UserType, types, "types")))
+        return self
+
+    def status(self, status: List[int]) -> "UserSearchQueryBuilder":
+        if status:
+            self._status = to_enums(UserStatus, status, "status")
+        return self
+
+    def _range(self, field: str, range_: DatetimeRange) -> "UserSearchQueryBuilder":
+        if range_ and range_.start:
+            self._filters.append(Q(**{f"{field}__gte": range_.start}))
+        if range_ and range_.end:
+            self._filters.append(Q(**{f"{field}__lte": range_.end}))
+        return self
+
+    def created_at_range(self, range_: DatetimeRange) -> "UserSearchQueryBuilder":
+        return self._range("created_at", range_)
+
+    def modified_at_range(self, range_: DatetimeRange) -> "UserSearchQueryBuilder":
+        return self._range("modified_at", range_)
+
+    def extra_text(self, words: List[str]) -> "UserSearchQueryBuilder":
+        # NOTE: can't be indexed, extra_filters should be preferred
+        if words:
+            self._filters.append(
+                Q(*[Q(extra__contains=word) for word in words], join_type="OR")
+            )
+        return self
+
+    def extra_filters(self, extra_filters: Dict[str, list]) -> "UserSearchQueryBuilder":
+        for key, values in (extra_filters or {}).items():
+            if key not in self.indexed_extra_keys:
+                raise UnindexedExtraKeyError(f"extra key[{key}] is not indexed")
+            # NOTE: answered by (key, value, user_id) index of side table
+            self._filters.append(
+                Q(
+                    id__in=Subquery(
+                        UserExtra.filter(
+                            key=key, value__in=extra_values_to_str(values)
+                        ).values("user_id")
+                    )
+                )
+            )
+        return self
+
+    def order_by(self, order_bys: List[str]) -> "UserSearchQueryBuilder":
+        self._order_bys = [order_by for order_by in order_bys if order_by.isascii()]
+        return self
+
+    def after(self, cursor: Optional[UserCursor]) -> "UserSearchQueryBuilder":
+        self._after = cursor
+        return self
+
+    def build(self) -> Tuple[QuerySet[User], QuerySet[User]]:
+        # returns (filtered query set for counting, ordered query set for paging)
+        query_set = User.filter(*self._filters, status__in=self._status)
+
+        order_bys = list(self._order_bys)
+        if not any(order_by.lstrip("-") == "id" for order_by in order_bys):
+            # NOTE: id breaks ties so that pages neither overlap nor skip users
+            descending = bool(order_bys) and order_bys[-1].startswith("-")
+            order_bys.append("-id" if descending else "id")
+
+        page_query_set = query_set.order_by(*order_bys)
+        if self._after:
+            # NOTE: seeks on index instead of scanning and dropping offset rows
+            page_query_set = page_query_set.filter(keyset_filter(self._after))
+        return query_set, page_query_set
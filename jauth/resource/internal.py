@@ -8,14 +8,18 @@ from aiohttp.web_urldispatcher import UrlDispatcher
 from jauth.decorator.internal import restrict_external_request_handler
 from jauth.decorator.request import request_error_handler
 from jauth.exception.permission import ServerKeyError
-from jauth.repository.user import user_model_to_dict
+from jauth.repository.user import normalize_user_id, user_model_to_dict
 from jauth.repository.user_base import UserRepository
 from jauth.resource import json_response, convert_request
 from jauth.resource.base import BaseResource
+from jauth.structure.cursor import TotalMode, UserCursor
 from jauth.structure.datetime_range import DatetimeRange
+from jauth.structure.record import UserIdentity
 from jauth.structure.token.temp import VerifyUserEmailClaim, ResetPasswordClaim
 from jauth.util.logger.logger import get_logger
-from jauth.model.user import User, UserType
+from jauth.model.user import UserType
+from jauth.util.metric import MetricRegistry
+from jauth.util.util import to_bool
 
 logger = get_logger(__name__)
 
@@ -34,12 +38,19 @@ class CreatePasswordResetTokenRequest:
 @deserialize.parser("size", int)
 @deserialize.default("order_bys", [])
 @deserialize.default("extras", [])
+@deserialize.default("extra_filters", {})
 @deserialize.default("emails", [])
 @deserialize.default("status", [])
 @deserialize.default("types", [])
+@deserialize.default("pagination", "offset")
+@deserialize.default("total_mode", TotalMode.EXACT)
+@deserialize.parser("total_mode", TotalMode)
+@deserialize.default("debug", False)
+@deserialize.parser("debug", to_bool)
 class SearchUserRequest:
     emails: List[str]
     extras: List[str]
+    extra_filters: dict  # indexed extra key to list of values
     created_at_range: Optional[DatetimeRange]
     modified_at_range: Optional[DatetimeRange]
     start: int
@@ -47,24 +58,41 @@ class SearchUserRequest:
     order_bys: List[str]
     status: List[int]
     types: List[int]
+    pagination: str  # offset or cursor
+    cursor: Optional[str]  # next_cursor of previous page, empty for first page
+    total_mode: TotalMode
+    debug: bool  # adds generated SQL and EXPLAIN of page query to result
+
+
+class BatchGetUsersRequest:
+    ids: List[str]
 
 
 class InternalHttpResource(BaseResource):
     ACCESS_TOKEN_EXPIRE_TIME = 60 * 60  # 1 hour
+    BATCH_GET_MAX_SIZE = 500
 
-    def __init__(self, user_repository: UserRepository, secret: dict):
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        secret: dict,
+        metric_registry: MetricRegistry,
+    ):
         self.user_repository = user_repository
+        self.metric_registry = metric_registry
         self.jwt_secret = secret["jwt_secret"]
         self.internal_api_keys: List[str] = secret["internal_api_keys"]
 
     def route(self, router: UrlDispatcher):
         router.add_route("POST", "/users:search", self.search_users)
+        router.add_route("POST", "/users:batchGet", self.batch_get_users)
         router.add_route(
             "POST", "/token/email_verify", self.generate_email_verifying_token
         )
         router.add_route(
             "POST", "/token/password_reset", self.generate_password_reset_token
         )
+        router.add_route("GET", "/metrics", self.get_metrics)
 
     def _check_server_key(self, request: Request):
         x_server_key = request.headers.get("X-Server-Key")
@@ -79,7 +107,9 @@ class InternalHttpResource(BaseResource):
         request_body: CreateEmailVerifyingTokenRequest = convert_request(
             CreateEmailVerifyingTokenRequest, await request.json()
         )
-        user: User = await self.user_repository.find_user_by_id(request_body.user_id)
+        user: UserIdentity = await self.user_repository.find_user_identity_by_id(
+            request_body.user_id
+        )
         if not user:
             return json_response(reason=f"user not found", status=404)
 
@@ -103,7 +133,9 @@ class InternalHttpResource(BaseResource):
         request_body: CreatePasswordResetTokenRequest = convert_request(
             CreatePasswordResetTokenRequest, await request.json()
         )
-        user: User = await self.user_repository.find_user_by_id(request_body.user_id)
+        user: UserIdentity = await self.user_repository.find_user_identity_by_id(
+            request_body.user_id
+        )
         if not user:
             return json_response(reason=f"user not found", status=404)
 
@@ -143,21 +175,86 @@ class InternalHttpResource(BaseResource):
         request_body: SearchUserRequest = convert_request(
             SearchUserRequest, await request.json()
         )
+        order_bys = [
+            order_by
+            for order_by in request_body.order_bys
+            if order_by in available_order_bys
+        ]
 
-        total, users = await self.user_repository.search_users(
+        after = None
+        start = request_body.start
+        if request_body.pagination == "cursor":
+            if request_body.size < 1:
+                return json_response(
+                    reason="size should be positive for cursor pagination", status=400
+                )
+            # NOTE: keyset pagination seeks on single sort key (and id), start is not used
+            start = 0
+            order_bys = order_bys[:1] or ["id"]
+            if request_body.cursor:
+                after = UserCursor.decode(request_body.cursor)
+                if after.order_by != order_bys[0]:
+                    return json_response(
+                        reason="cursor does not match order_bys", status=400
+                    )
+        elif request_body.pagination != "offset":
+            return json_response(reason="invalid pagination", status=400)
+
+        conditions = dict(
             emails=request_body.emails,
             created_at_range=request_body.created_at_range,
             modified_at_range=request_body.modified_at_range,
             extra_text=request_body.extras,
-            start=request_body.start,
+            extra_filters=request_body.extra_filters,
+            start=start,
             size=request_body.size,
-            order_bys=list(available_order_bys.intersection(request_body.order_bys)),
+            order_bys=order_bys,
             status=request_body.status,
             types=request_body.types,
+            after=after,
         )
-        return json_response(
-            result={
-                "total": total,
-                "users": [user_model_to_dict(user) for user in users],
-            }
+        total, users = await self.user_repository.search_users(
+            **conditions, total_mode=request_body.total_mode
         )
+        result = {
+            "total": total,
+            "users": [user_model_to_dict(user) for user in users],
+        }
+        if request_body.pagination == "cursor":
+            result["next_cursor"] = (
+                UserCursor.from_user(order_bys[0], users[-1]).encode()
+                if len(users) == request_body.size
+                else None
+            )
+        if request_body.debug:
+            result["debug"] = await self.user_repository.explain_search_users(
+                **conditions
+            )
+        return json_response(result=result)
+
+    @request_error_handler
+    @restrict_external_request_handler
+    async def batch_get_users(self, request):
+        self._check_server_key(request=request)
+
+        request_body: BatchGetUsersRequest = convert_request(
+            BatchGetUsersRequest, await request.json()
+        )
+        if len(request_body.ids) > self.BATCH_GET_MAX_SIZE:
+            return json_response(
+                reason=f"ids can not be more than {self.BATCH_GET_MAX_SIZE}",
+                status=400,
+            )
+
+        users = await self.user_repository.find_users_by_ids(request_body.ids)
+        result = {}
+        for _id in request_body.ids:
+            user = users.get(normalize_user_id(_id))
+            result[_id] = user_model_to_dict(user) if user else None
+        return json_response(result=result)
+
+    @request_error_handler
+    @restrict_external_request_handler
+    async def get_metrics(self, request):
+        self._check_server_key(request=request)
+        return json_response(result=self.metric_registry.collect())
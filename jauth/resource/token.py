@@ -1,21 +1,29 @@
+import asyncio
+import datetime
 import time
-from typing import Optional
+from typing import Optional, Set, Union
 
-import bcrypt
 import deserialize
 from aiohttp.web_urldispatcher import UrlDispatcher
 
 from jauth.decorator.request import request_error_handler
 from jauth.decorator.token import token_error_handler
-from jauth.exception.third_party import ThirdPartyTokenVerifyError
+from jauth.exception.overload import OverloadError
+from jauth.exception.third_party import (
+    ThirdPartyTokenVerifyError,
+    ThirdPartyUnavailableError,
+)
 from jauth.external.token import ThirdPartyUser
 from jauth.repository.token_base import TokenRepository
 from jauth.repository.user_base import UserRepository
 from jauth.resource import json_response, convert_request
 from jauth.resource.base import BaseResource
+from jauth.structure.record import UserIdentity
 from jauth.structure.token.user import UserClaim, get_bearer_token
+from jauth.util.admission import Priority
 from jauth.util.logger.logger import get_logger
 from jauth.model.user import UserType, User
+from jauth.util.password import PasswordHasher
 from jauth.util.util import object_to_dict, to_string, utc_now
 
 logger = get_logger(__name__)
@@ -46,9 +54,12 @@ class TokenHttpResource(BaseResource):
         token_repository: TokenRepository,
         secret: dict,
         external: dict,
+        password_hasher: PasswordHasher,
     ):
         self.user_repository = user_repository
         self.token_repository = token_repository
+        self.password_hasher = password_hasher
+        self._background_tasks: Set[asyncio.Task] = set()
         self.third_party_user_method = {
             UserType.FACEBOOK: external["third_party"]["facebook"].get_user,
             UserType.KAKAO: external["third_party"]["kakao"].get_user,
@@ -64,16 +75,17 @@ class TokenHttpResource(BaseResource):
         router.add_route("GET", "/self", self.get)
 
     async def _get_user_id_by_refresh_token(self, refresh_token) -> Optional[str]:
-        token = await self.token_repository.find_token_by_id(refresh_token)
-        if (
-            token.created_at.timestamp() + self.REFRESH_TOKEN_EXPIRE_TIME
-            < utc_now().timestamp()
-        ):
-            await self.token_repository.delete_token(refresh_token)
+        # NOTE: expired tokens are deleted by ExpiredTokenSweeper
+        token = await self.token_repository.find_token_record_by_id(
+            refresh_token,
+            created_after=utc_now()
+            - datetime.timedelta(seconds=self.REFRESH_TOKEN_EXPIRE_TIME),
+        )
+        if not token:
             return None
         return str(token.user_id)
 
-    def _create_access_token(self, user: User) -> str:
+    def _create_access_token(self, user: Union[User, UserIdentity]) -> str:
         user_claim: UserClaim = deserialize.deserialize(
             UserClaim,
             {
@@ -88,6 +100,30 @@ class TokenHttpResource(BaseResource):
         token = await self.token_repository.create_token(user_id=str(user.id))
         return str(token.id)
 
+    async def _rehash_password(self, user: User, password: str):
+        try:
+            hashed_password = await self.password_hasher.hash_password(
+                password, priority=Priority.BACKGROUND
+            )
+        except OverloadError:
+            logger.debug(f"Skip rehashing password of {user.id} (overloaded)")
+            return
+
+        try:
+            await self.user_repository.replace_hashed_password(
+                user_id=str(user.id),
+                original_hashed_password=user.hashed_password,
+                hashed_password=hashed_password,
+            )
+        except Exception:
+            # NOTE: nothing awaits this background task, so error is logged here
+            logger.exception(f"Failed to rehash password of {user.id}")
+
+    def _rehash_password_in_background(self, user: User, password: str):
+        task = asyncio.ensure_future(self._rehash_password(user, password))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     @request_error_handler
     @token_error_handler
     async def get(self, request):
@@ -106,11 +142,14 @@ class TokenHttpResource(BaseResource):
         if user is None:
             return json_response(reason="user not found", status=404)
 
-        if not bcrypt.checkpw(
-            request_body.password.encode(), user.hashed_password.encode()
+        if not await self.password_hasher.check_password(
+            request_body.password, user.hashed_password, priority=Priority.LOGIN
         ):
             return json_response(reason="Invalid password", status=403)
 
+        if self.password_hasher.needs_rehash(user.hashed_password):
+            self._rehash_password_in_background(user, request_body.password)
+
         refresh_token = await self._create_refresh_token(user)
         access_token = self._create_access_token(user)
 
@@ -137,6 +176,8 @@ class TokenHttpResource(BaseResource):
             )
         except ThirdPartyTokenVerifyError:
             return json_response(reason="invalid third party token", status=400)
+        except ThirdPartyUnavailableError as e:
+            return json_response(reason=f"third party is unavailable: {e}", status=503)
 
         user: User = await self.user_repository.find_user_by_third_party_user_id(
             third_party_user_id=third_party_user.id,
@@ -167,7 +208,7 @@ class TokenHttpResource(BaseResource):
         if user_id is None:
             return json_response(reason="token not found", status=404)
 
-        user = await self.user_repository.find_user_by_id(to_string(user_id))
+        user = await self.user_repository.find_user_identity_by_id(to_string(user_id))
         if not user:
             return json_response(reason=f"user not found", status=404)
 
@@ -1,22 +1,26 @@
-import bcrypt
 import deserialize
 from aiohttp.web_urldispatcher import UrlDispatcher
 
 from jauth.decorator.request import request_error_handler
 from jauth.decorator.token import token_error_handler
-from jauth.exception.third_party import ThirdPartyTokenVerifyError
-from jauth.external.callback.base import BaseCallbackHandler
-from jauth.external.callback.user_create import UserCreationCallbackHandler
-from jauth.external.callback.user_update import UserUpdateCallbackHandler
+from jauth.exception.third_party import (
+    ThirdPartyTokenVerifyError,
+    ThirdPartyUnavailableError,
+)
 from jauth.external.token import ThirdPartyUser
+from jauth.model.user_event import UserEventType
 from jauth.repository.user import user_model_to_dict
 from jauth.repository.user_base import UserRepository
+from jauth.repository.user_event_base import UserEventRepository
 from jauth.resource import convert_request, json_response
 from jauth.resource.base import BaseResource
+from jauth.structure.record import UserRecord
 from jauth.structure.token.temp import VerifyUserEmailClaim, ResetPasswordClaim
 from jauth.structure.token.user import UserClaim, get_bearer_token
+from jauth.util.admission import Priority
 from jauth.util.logger.logger import get_logger
 from jauth.model.user import UserType, User, UserStatus
+from jauth.util.password import PasswordHasher
 from jauth.util.util import is_valid_email, is_valid_password, is_valid_account
 
 logger = get_logger(__name__)
@@ -60,16 +64,16 @@ class ResetPasswordRequest:
 class UsersHttpResource(BaseResource):
     def __init__(
         self,
-        user_creation_callback_handler: BaseCallbackHandler,
-        user_update_callback_handler: BaseCallbackHandler,
         user_repository: UserRepository,
+        user_event_repository: UserEventRepository,
         secret: dict,
         external: dict,
+        password_hasher: PasswordHasher,
     ):
-        self.user_creation_callback_handler = user_creation_callback_handler
-        self.user_update_callback_handler = user_update_callback_handler
         self.user_repository = user_repository
+        self.user_event_repository = user_event_repository
         self.jwt_secret = secret["jwt_secret"]
+        self.password_hasher = password_hasher
         self.third_party_user_method = {
             UserType.FACEBOOK: external["third_party"]["facebook"].get_user,
             UserType.KAKAO: external["third_party"]["kakao"].get_user,
@@ -108,7 +112,7 @@ class UsersHttpResource(BaseResource):
 
         return json_response(result=user_model_to_dict(user))
 
-    async def _send_user_creation_event(self, user: User):
+    async def _create_user_creation_event(self, user: User):
         user_type_to_str_map = {
             UserType.EMAIL: "EMAIL",
             UserType.KAKAO: "KAKAO",
@@ -123,34 +127,39 @@ class UsersHttpResource(BaseResource):
             UserStatus.WITHDRAWN: "WITHDRAWN",
         }
 
-        await self.user_creation_callback_handler.handle(
-            {
-                "id": user.id,
+        # NOTE: written in the same transaction with user and delivered later
+        await self.user_event_repository.create_user_event(
+            user_id=user.id,
+            event_type=UserEventType.CREATION,
+            payload={
+                "id": str(user.id),
                 "email": user.email,
                 "third_party_user_id": user.third_party_user_id,
                 "type": user_type_to_str_map[user.type],
                 "status": user_status_to_str_map[user.status],
                 "is_email_verified": user.is_email_verified,
                 "extra": user.extra,
-            }
+            },
         )
 
-    async def _send_user_update_event(self, original: User, delta: dict):
+    async def _create_user_update_event(self, original: UserRecord, delta: dict):
         user_status_to_str_map = {
             UserStatus.NORMAL: "NORMAL",
             UserStatus.DELETED: "DELETED",
             UserStatus.WITHDRAWN: "WITHDRAWN",
         }
 
-        await self.user_update_callback_handler.handle(
-            {
-                "id": original.id,
+        await self.user_event_repository.create_user_event(
+            user_id=original.id,
+            event_type=UserEventType.UPDATE,
+            payload={
+                "id": str(original.id),
                 "email": original.email,
                 "status": user_status_to_str_map[original.status],
                 "is_email_verified": original.is_email_verified,
                 "extra": original.extra,
             }
-            | delta
+            | delta,
         )
 
     @request_error_handler
@@ -169,6 +178,8 @@ class UsersHttpResource(BaseResource):
             )
         except ThirdPartyTokenVerifyError:
             return json_response(reason="invalid third party token", status=400)
+        except ThirdPartyUnavailableError as e:
+            return json_response(reason=f"third party is unavailable: {e}", status=503)
 
         user: User = await self.user_repository.find_user_by_third_party_user_id(
             third_party_user_id=third_party_user.id,
@@ -180,13 +191,14 @@ class UsersHttpResource(BaseResource):
                 reason=f"account[{third_party_user.id}] already exists", status=409
             )
 
-        user = await self.user_repository.create_user(
-            user_type=third_party_user.type,
-            email=third_party_user.email,
-            third_party_user_id=third_party_user.id,
-            extra=request_body.extra,
-        )
-        await self._send_user_creation_event(user)
+        async with self.user_repository.transaction():
+            user = await self.user_repository.create_user(
+                user_type=third_party_user.type,
+                email=third_party_user.email,
+                third_party_user_id=third_party_user.id,
+                extra=request_body.extra,
+            )
+            await self._create_user_creation_event(user)
         return json_response(result=user_model_to_dict(user))
 
     @request_error_handler
@@ -214,17 +226,18 @@ class UsersHttpResource(BaseResource):
         if not is_valid_password(request_body.password):
             return json_response(reason="password policy is not satisfied", status=400)
 
-        hashed_password = bcrypt.hashpw(
-            request_body.password.encode(), bcrypt.gensalt()
-        ).decode()
-        user = await self.user_repository.create_user(
-            user_type=UserType.EMAIL,
-            account=request_body.account,
-            hashed_password=hashed_password,
-            email=request_body.email,
-            extra=request_body.extra,
+        hashed_password = await self.password_hasher.hash_password(
+            request_body.password, priority=Priority.ACCOUNT_UPDATE
         )
-        await self._send_user_creation_event(user)
+        async with self.user_repository.transaction():
+            user = await self.user_repository.create_user(
+                user_type=UserType.EMAIL,
+                account=request_body.account,
+                hashed_password=hashed_password,
+                email=request_body.email,
+                extra=request_body.extra,
+            )
+            await self._create_user_creation_event(user)
         return json_response(result=user_model_to_dict(user))
 
     @request_error_handler
@@ -239,7 +252,7 @@ class UsersHttpResource(BaseResource):
                 reason=f"{request_body.email} is invalid email format", status=400
             )
 
-        user: User = await self.user_repository.find_user_by_id(user_info.id)
+        user: UserRecord = await self.user_repository.find_user_by_id(user_info.id)
         if not user:
             return json_response(reason=f"user not found", status=404)
 
@@ -247,21 +260,21 @@ class UsersHttpResource(BaseResource):
         if user.email != request_body.email:
             verified_status["is_email_verified"] = False
 
-        affected_rows = await self.user_repository.update_user(
-            user_id=user_info.id,
-            email=request_body.email,
-            extra=request_body.extra,
-            **verified_status,
-        )
-
-        await self._send_user_update_event(
-            original=user,
-            delta={
-                "email": request_body.email,
-                "extra": request_body.extra,
-                "is_email_verified": False,
-            },
-        )
+        async with self.user_repository.transaction():
+            affected_rows = await self.user_repository.update_user(
+                user_id=user_info.id,
+                email=request_body.email,
+                extra=request_body.extra,
+                **verified_status,
+            )
+            await self._create_user_update_event(
+                original=user,
+                delta={
+                    "email": request_body.email,
+                    "extra": request_body.extra,
+                    "is_email_verified": False,
+                },
+            )
         return json_response(result=affected_rows > 0)
 
     @request_error_handler
@@ -273,21 +286,22 @@ class UsersHttpResource(BaseResource):
         user_info: VerifyUserEmailClaim = VerifyUserEmailClaim.from_jwt(
             request_body.temp_token, self.jwt_secret
         )
-        user: User = await self.user_repository.find_user_by_id(user_info.id)
+        user: UserRecord = await self.user_repository.find_user_by_id(user_info.id)
 
         if not user:
             return json_response(reason=f"user not found", status=404)
 
-        await self.user_repository.update_user(
-            user_id=user_info.id,
-            is_email_verified=True,
-        )
-        await self._send_user_update_event(
-            original=user,
-            delta={
-                "is_email_verified": True,
-            },
-        )
+        async with self.user_repository.transaction():
+            await self.user_repository.update_user(
+                user_id=user_info.id,
+                is_email_verified=True,
+            )
+            await self._create_user_update_event(
+                original=user,
+                delta={
+                    "is_email_verified": True,
+                },
+            )
         return json_response(result=True)
 
     @request_error_handler
@@ -297,7 +311,10 @@ class UsersHttpResource(BaseResource):
         request_body: UpdateUserPasswordRequest = convert_request(
             UpdateUserPasswordRequest, await request.json()
         )
-        user: User = await self.user_repository.find_user_by_id(user_info.id)
+        # NOTE: password may be changed through another worker right before
+        user: UserRecord = await self.user_repository.find_user_by_id(
+            user_info.id, from_primary=True
+        )
         if not user:
             return json_response(reason=f"user not found", status=404)
 
@@ -309,17 +326,20 @@ class UsersHttpResource(BaseResource):
         if not is_valid_password(request_body.new_password):
             return json_response(reason="password policy is not satisfied", status=400)
 
-        if not bcrypt.checkpw(
-            request_body.original_password.encode(), user.hashed_password.encode()
+        if not await self.password_hasher.check_password(
+            request_body.original_password,
+            user.hashed_password,
+            priority=Priority.ACCOUNT_UPDATE,
         ):
             return json_response(reason="Invalid password", status=403)
 
-        hashed_password = bcrypt.hashpw(
-            request_body.new_password.encode(), bcrypt.gensalt()
-        ).decode()
+        hashed_password = await self.password_hasher.hash_password(
+            request_body.new_password, priority=Priority.ACCOUNT_UPDATE
+        )
 
-        affected_rows = await self.user_repository.update_user(
+        affected_rows = await self.user_repository.replace_hashed_password(
             user_id=user_info.id,
+            original_hashed_password=user.hashed_password,
             hashed_password=hashed_password,
         )
         return json_response(result=affected_rows > 0)
@@ -342,9 +362,9 @@ class UsersHttpResource(BaseResource):
         if not is_valid_password(request_body.new_password):
             return json_response(reason="password policy is not satisfied", status=400)
 
-        hashed_password = bcrypt.hashpw(
-            request_body.new_password.encode(), bcrypt.gensalt()
-        ).decode()
+        hashed_password = await self.password_hasher.hash_password(
+            request_body.new_password, priority=Priority.ACCOUNT_UPDATE
+        )
 
         affected_rows = await self.user_repository.update_user(
             user_id=user_info.id,
@@ -0,0 +1,65 @@
+import base64
+import binascii
+import datetime
+import enum
+import json
+import uuid
+from typing import NamedTuple, Union
+
+from jauth.exception.request import InvalidCursorError
+from jauth.model.user import User
+
+CursorValue = Union[str, datetime.datetime, None]
+
+
+class TotalMode(str, enum.Enum):
+    EXACT = "exact"
+    SKIP = "skip"
+    ESTIMATE = "estimate"  # optimizer's row estimate, cheap but inaccurate
+
+
+class UserCursor(NamedTuple):
+    # NOTE: position right after the last user of a page, sorted by order_by then id
+    order_by: str
+    value: CursorValue
+    id: str
+
+    @property
+    def field(self) -> str:
+        return self.order_by.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.order_by.startswith("-")
+
+    @classmethod
+    def from_user(cls, order_by: str, user: User) -> "UserCursor":
+        return cls(
+            order_by=order_by,
+            value=getattr(user, order_by.lstrip("-")),
+            id=str(user.id),
+        )
+
+    def encode(self) -> str:
+        value = self.value
+        if isinstance(value, datetime.datetime):
+            value = {"datetime": value.isoformat()}
+        elif value is not None:
+            value = str(value)
+
+        data = json.dumps([self.order_by, value, self.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "UserCursor":
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            order_by, value, _id = json.loads(
+                base64.urlsafe_b64decode(cursor + padding)
+            )
+            if isinstance(value, dict):
+                value = datetime.datetime.fromisoformat(value["datetime"])
+            _id = str(uuid.UUID(str(_id)))
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise InvalidCursorError(f"invalid cursor: {e}")
+        return cls(order_by=order_by, value=value, id=_id)
@@ -0,0 +1,42 @@
+import copy
+import datetime
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from jauth.model.user import User, UserStatus, UserType
+
+
+# NOTE: lightweight projections of models for hot lookups which don't need
+#  whole model (e.g. extra JSON) to be fetched and hydrated
+class UserIdentity(NamedTuple):
+    id: str
+    type: UserType
+    status: UserStatus
+
+
+class UserRecord(NamedTuple):
+    id: UUID
+    email: str
+    account: Optional[str]
+    hashed_password: Optional[str]
+    third_party_user_id: Optional[str]
+    type: UserType
+    status: UserStatus
+    is_email_verified: bool
+    extra: dict
+    created_at: Optional[datetime.datetime]
+    modified_at: Optional[datetime.datetime]
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserRecord":
+        return cls(*(getattr(user, field) for field in cls._fields))
+
+    def copy(self) -> "UserRecord":
+        # NOTE: record is shared through cache, so callers get their own extra
+        return self._replace(extra=copy.deepcopy(self.extra))
+
+
+class TokenRecord(NamedTuple):
+    id: str
+    user_id: str
+    created_at: datetime.datetime
@@ -0,0 +1,41 @@
+import abc
+import asyncio
+from typing import Optional
+
+from jauth.util.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask(abc.ABC):
+    def __init__(self, interval: float):
+        self.interval = interval  # seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @abc.abstractmethod
+    async def run_once(self):
+        pass
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"{type(self).__name__} failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
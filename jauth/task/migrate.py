@@ -0,0 +1,25 @@
+import asyncio
+
+from tortoise import Tortoise
+
+from jauth.config import config
+from jauth.util.tortoise import init_db
+
+
+# NOTE: run before starting workers of new version, so long migrations don't keep
+#  workers waiting for migration lock on start up
+#  $ python -m jauth.task.migrate
+async def main():
+    mysql_config = config.api_server.mysql
+    await init_db(
+        host=mysql_config.host,
+        port=mysql_config.port,
+        user=mysql_config.user,
+        password=mysql_config.password,
+        db=mysql_config.database,
+    )
+    await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
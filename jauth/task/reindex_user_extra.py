@@ -0,0 +1,40 @@
+import asyncio
+
+from tortoise import Tortoise
+
+from jauth.config import config
+from jauth.repository.user import UserRepositoryImpl
+from jauth.util.logger.logger import get_logger
+from jauth.util.tortoise import init_db
+
+logger = get_logger(__name__)
+
+
+# NOTE: run after changing API_SERVER__INDEXED_EXTRA_KEYS to backfill existing users
+#  $ python -m jauth.task.reindex_user_extra
+async def main(batch_size: int = 1000):
+    mysql_config = config.api_server.mysql
+    await init_db(
+        host=mysql_config.host,
+        port=mysql_config.port,
+        user=mysql_config.user,
+        password=mysql_config.password,
+        db=mysql_config.database,
+    )
+    user_repository = UserRepositoryImpl(
+        indexed_extra_keys=config.api_server.indexed_extra_keys
+    )
+
+    after_id = None
+    while True:
+        after_id = await user_repository.reindex_user_extra(
+            after_id=after_id, limit=batch_size
+        )
+        if after_id is None:
+            break
+        logger.info(f"Reindexed extra of users until {after_id}")
+    await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import asyncio
+import datetime
+
+from jauth.repository.token_base import TokenRepository
+from jauth.task import PeriodicTask
+from jauth.util.logger.logger import get_logger
+from jauth.util.util import utc_now
+
+logger = get_logger(__name__)
+
+
+class ExpiredTokenSweeper(PeriodicTask):
+    def __init__(
+        self,
+        token_repository: TokenRepository,
+        expire_seconds: int,
+        interval: float = 60,
+        batch_size: int = 500,
+        batch_interval: float = 0.5,
+    ):
+        super().__init__(interval)
+        self.token_repository = token_repository
+        self.expire_seconds = expire_seconds
+        self.batch_size = batch_size
+        # NOTE: pause between batches keeps deletes from saturating primary
+        self.batch_interval = batch_interval  # seconds
+        self.runs = 0
+        self.last_swept = 0
+        self.swept = 0
+
+    async def run_once(self):
+        created_before = utc_now() - datetime.timedelta(seconds=self.expire_seconds)
+        swept = 0
+        while True:
+            deleted = await self.token_repository.delete_expired_tokens(
+                created_before=created_before, limit=self.batch_size
+            )
+            swept += deleted
+            self.swept += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_interval)
+
+        self.runs += 1
+        self.last_swept = swept
+        if swept:
+            logger.info(f"Swept {swept} tokens created before {created_before}")
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "last_swept": self.last_swept,
+            "swept": self.swept,
+        }
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+from typing import Dict
+
+from jauth.exception.callback import CallbackDeliveryError
+from jauth.external.callback.base import BaseCallbackHandler
+from jauth.model.user_event import UserEvent, UserEventType
+from jauth.repository.user_event_base import UserEventRepository
+from jauth.task import PeriodicTask
+from jauth.util.logger.logger import get_logger
+from jauth.util.util import utc_now
+
+logger = get_logger(__name__)
+
+
+class UserEventDispatcher(PeriodicTask):
+    def __init__(
+        self,
+        user_event_repository: UserEventRepository,
+        handlers: Dict[UserEventType, BaseCallbackHandler],
+        interval: float = 1,
+        batch_size: int = 100,
+        lease_seconds: int = 60,
+        max_attempts: int = 10,
+        base_backoff: float = 1,
+        max_backoff: float = 10 * 60,
+        retention: int = 7 * 24 * 60 * 60,
+    ):
+        super().__init__(interval)
+        for event_type, handler in handlers.items():
+            # NOTE: event is claimed again by another dispatcher after lease,
+            #  so callback must be given up well before it
+            if handler.timeout * 2 > lease_seconds:
+                raise ValueError(
+                    f"callback timeout of {event_type.value} ({handler.timeout}s) "
+                    f"must be under half of lease ({lease_seconds}s)"
+                )
+        self.user_event_repository = user_event_repository
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff  # seconds
+        self.max_backoff = max_backoff  # seconds
+        self.retention = retention  # seconds to keep delivered events
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.lost_leases = 0
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.base_backoff * 2 ** (attempts - 1), self.max_backoff)
+
+    async def _dispatch(self, event: UserEvent):
+        attempts = event.attempts + 1
+        delivered_urls = list(event.delivered_urls or [])
+        try:
+            await self.handlers[event.type].handle(
+                event.payload, delivered_urls=delivered_urls
+            )
+        except Exception as e:
+            if isinstance(e, CallbackDeliveryError):
+                delivered_urls += e.delivered_urls
+            give_up = attempts >= self.max_attempts
+            affected_rows = await self.user_event_repository.mark_failed(
+                event=event,
+                attempts=attempts,
+                error=repr(e),
+                next_attempt_at=utc_now()
+                + datetime.timedelta(seconds=self._backoff(attempts)),
+                give_up=give_up,
+                delivered_urls=delivered_urls,
+            )
+            if not affected_rows:
+                self._lose_lease(event)
+            elif give_up:
+                self.failed += 1
+                logger.error(
+                    f"Give up {event.type.value} event({event.id}) "
+                    f"of {event.user_id} after {attempts} attempts: {e!r}"
+                )
+            else:
+                self.retried += 1
+                logger.warning(
+                    f"Failed {event.type.value} event({event.id}) "
+                    f"of {event.user_id} ({attempts} attempts): {e!r}"
+                )
+            return
+
+        if await self.user_event_repository.mark_delivered(
+            event=event, attempts=attempts
+        ):
+            self.delivered += 1
+        else:
+            self._lose_lease(event)
+
+    def _lose_lease(self, event: UserEvent):
+        self.lost_leases += 1
+        logger.warning(
+            f"Lease of {event.type.value} event({event.id}) "
+            f"of {event.user_id} was taken over"
+        )
+
+    async def run_once(self):
+        events = await self.user_event_repository.claim_pending_events(
+            limit=self.batch_size, lease_seconds=self.lease_seconds
+        )
+        # NOTE: claimed events belong to different users, so order is kept
+        await asyncio.gather(*[self._dispatch(event) for event in events])
+        await self.user_event_repository.delete_delivered_events(
+            delivered_before=utc_now() - datetime.timedelta(seconds=self.retention),
+            limit=self.batch_size,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "lost_leases": self.lost_leases,
+        }
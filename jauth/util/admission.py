@@ -0,0 +1,116 @@
+import asyncio
+import collections
+import contextlib
+import enum
+import math
+import time
+from typing import Deque, Dict
+
+from jauth.exception.overload import AdmissionRejectedError
+from jauth.util.metric import LatencyRecorder
+
+
+class Priority(enum.IntEnum):
+    # NOTE: lower value is admitted first
+    LOGIN = 0
+    ACCOUNT_UPDATE = 1  # signup, password change and reset
+    BACKGROUND = 2  # e.g) rehashing password with current policy
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int, max_queue_size: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self._running = 0
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {
+            priority: collections.deque() for priority in Priority
+        }
+        self._admitted = {priority: 0 for priority in Priority}
+        self._rejected = {priority: 0 for priority in Priority}
+        self._hold_latency = LatencyRecorder()
+
+    def _queue_size(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _retry_after(self) -> int:
+        pending = self._queue_size() + self._running
+        estimated = pending / self.max_concurrency * self._hold_latency.average()
+        return max(math.ceil(estimated), 1)
+
+    def _reject(self, priority: Priority):
+        self._rejected[priority] += 1
+        return AdmissionRejectedError(retry_after=self._retry_after())
+
+    def _shed_lower_priority_waiter(self, priority: Priority) -> bool:
+        for lower_priority in sorted(Priority, reverse=True):
+            if lower_priority <= priority:
+                break
+            queue = self._queues[lower_priority]
+            if queue:
+                # NOTE: newest waiter of the lowest priority is shed first
+                queue.pop().set_exception(self._reject(lower_priority))
+                return True
+        return False
+
+    def _wake_up_next(self):
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._running < self.max_concurrency:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    self._running += 1
+                    waiter.set_result(None)
+            if self._running >= self.max_concurrency:
+                return
+
+    async def _acquire(self, priority: Priority):
+        if self._running < self.max_concurrency and not self._queue_size():
+            self._running += 1
+            return
+
+        if self._queue_size() >= self.max_queue_size:
+            if not self._shed_lower_priority_waiter(priority):
+                raise self._reject(priority)
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._queues[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and not waiter.exception():
+                # NOTE: admitted right before cancellation, so give the slot back
+                self._release()
+            elif waiter in self._queues[priority]:
+                self._queues[priority].remove(waiter)
+            raise
+
+    def _release(self):
+        self._running -= 1
+        self._wake_up_next()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, priority: Priority):
+        await self._acquire(priority)
+        self._admitted[priority] += 1
+        admitted_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._hold_latency.record(time.perf_counter() - admitted_at)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "running": self._running,
+            "queued": {
+                priority.name: len(queue) for priority, queue in self._queues.items()
+            },
+            "admitted": {
+                priority.name: count for priority, count in self._admitted.items()
+            },
+            "rejected": {
+                priority.name: count for priority, count in self._rejected.items()
+            },
+        }
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class BatchWriter(Generic[T]):
+    def __init__(
+        self,
+        write: Callable[[List[T]], Awaitable[None]],
+        window_ms: float = 2,
+        max_batch_size: int = 100,
+    ):
+        self._write = write
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+        self._closed = False
+        self.batches = 0
+        self.rows = 0
+        self.failed_batches = 0
+        self.largest_batch_size = 0
+
+    async def write(self, item: T):
+        if self._closed:
+            # NOTE: no timer would flush it after close, so write it directly
+            await self._write([item])
+            return
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush_pending)
+        # NOTE: resolved when the batch containing item is committed
+        await future
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: List[Tuple[T, asyncio.Future]]):
+        self.batches += 1
+        self.rows += len(batch)
+        self.largest_batch_size = max(self.largest_batch_size, len(batch))
+        try:
+            await self._write([item for item, _ in batch])
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in batch:
+                # NOTE: caller may be cancelled while waiting
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def close(self):
+        self._closed = True
+        self._flush_pending()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "closed": self._closed,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "rows": self.rows,
+            "average_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "largest_batch_size": self.largest_batch_size,
+            "failed_batches": self.failed_batches,
+        }
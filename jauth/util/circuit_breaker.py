@@ -0,0 +1,111 @@
+import collections
+import enum
+import time
+from typing import Deque, Tuple
+
+from jauth.exception.third_party import ThirdPartyUnavailableError
+from jauth.util.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 50,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: float = 2.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_duration: float = 30,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold  # seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration  # seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitState.CLOSED
+        # (is_failed, is_slow) of recent calls
+        self._outcomes: Deque[Tuple[bool, bool]] = collections.deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.rejected = 0
+
+    def _transit(self, state: CircuitState):
+        logger.warning(f"Circuit of {self.name}: {self.state.value} -> {state.value}")
+        self.state = state
+        self._outcomes.clear()
+        self._half_open_calls = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._outcomes:
+            return 0.0, 0.0
+        failed = sum(1 for is_failed, _ in self._outcomes if is_failed)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        return failed / len(self._outcomes), slow / len(self._outcomes)
+
+    def before_call(self):
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_duration:
+                self.rejected += 1
+                raise ThirdPartyUnavailableError(f"circuit of {self.name} is open")
+            self._transit(CircuitState.HALF_OPEN)
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                raise ThirdPartyUnavailableError(
+                    f"circuit of {self.name} is half open (trial call in progress)"
+                )
+            self._half_open_calls += 1
+
+    def _record(self, is_failed: bool, is_slow: bool):
+        if self.state == CircuitState.HALF_OPEN:
+            if is_failed or is_slow:
+                self._transit(CircuitState.OPEN)
+            else:
+                self._transit(CircuitState.CLOSED)
+            return
+
+        self._outcomes.append((is_failed, is_slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+
+        failure_rate, slow_call_rate = self._rates()
+        if (
+            failure_rate >= self.failure_rate_threshold
+            or slow_call_rate >= self.slow_call_rate_threshold
+        ):
+            self._transit(CircuitState.OPEN)
+
+    def on_success(self, elapsed: float):
+        self._record(is_failed=False, is_slow=elapsed >= self.slow_call_threshold)
+
+    def on_failure(self):
+        self._record(is_failed=True, is_slow=False)
+
+    def on_cancel(self):
+        # NOTE: cancelled call gives its trial slot back without outcome
+        if self.state == CircuitState.HALF_OPEN:
+            self._half_open_calls = max(self._half_open_calls - 1, 0)
+
+    def stats(self) -> dict:
+        failure_rate, slow_call_rate = self._rates()
+        return {
+            "state": self.state.value,
+            "failure_rate": failure_rate,
+            "slow_call_rate": slow_call_rate,
+            "rejected": self.rejected,
+        }
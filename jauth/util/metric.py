@@ -0,0 +1,50 @@
+import collections
+import math
+from typing import Callable, Dict
+
+
+class LatencyRecorder:
+    def __init__(self, window_size: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # NOTE: recent samples only, for percentile estimation
+        self._window = collections.deque(maxlen=window_size)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._window.append(seconds)
+
+    def percentile(self, percent: float) -> float:
+        if not self._window:
+            return 0.0
+        samples = sorted(self._window)
+        index = max(math.ceil(len(samples) * percent / 100) - 1, 0)
+        return samples[index]
+
+    def average(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "average_ms": self.average() * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class MetricRegistry:
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], dict]] = {}
+
+    def register(self, name: str, provider: Callable[[], dict]):
+        self._providers[name] = provider
+
+    def collect(self) -> dict:
+        return {name: provider() for name, provider in self._providers.items()}
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Tuple
+
+import bcrypt
+
+from jauth.util.admission import AdmissionController, Priority
+from jauth.util.logger.logger import get_logger
+from jauth.util.metric import LatencyRecorder
+
+logger = get_logger(__name__)
+
+
+def _timed(func: Callable, *args) -> Tuple[object, float]:
+    # NOTE: module level function to be picklable by ProcessPoolExecutor
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started_at
+
+
+def _hash_password(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _check_password(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed_password)
+
+
+def _calibrate_rounds(latency_budget: float, min_rounds: int, max_rounds: int) -> int:
+    # NOTE: each additional round doubles hashing time
+    password = b"jauth-calibration"
+    rounds = min_rounds
+    _, elapsed = _timed(_hash_password, password, rounds)
+    while rounds < max_rounds and elapsed * 2 <= latency_budget:
+        rounds += 1
+        _, elapsed = _timed(_hash_password, password, rounds)
+
+    if elapsed > latency_budget and rounds > min_rounds:
+        rounds -= 1
+    return rounds
+
+
+def get_rounds(hashed_password: str) -> int:
+    # e.g) $2b$12$... -> 12
+    return int(hashed_password.split("$")[2])
+
+
+class PasswordHasher:
+    EXECUTOR_CLASSES = {
+        "thread": ThreadPoolExecutor,
+        "process": ProcessPoolExecutor,
+    }
+
+    def __init__(
+        self,
+        admission_controller: AdmissionController,
+        executor_type: str = "thread",
+        worker_count: int = 4,
+        rounds: int = 12,
+    ):
+        try:
+            executor_class = self.EXECUTOR_CLASSES[executor_type]
+        except KeyError:
+            raise ValueError(f"unknown password hashing executor: {executor_type}")
+
+        self.executor_type = executor_type
+        self.worker_count = worker_count
+        self._executor: Executor = executor_class(max_workers=worker_count)
+        self.admission_controller = admission_controller
+        self.rounds = rounds
+        self.latency_budget_ms = 0
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._wait_latency = LatencyRecorder()
+        self._hash_latency = LatencyRecorder()
+
+    async def _run(self, func: Callable, *args):
+        loop = asyncio.get_event_loop()
+        self._queue_depth += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+        submitted_at = time.perf_counter()
+        try:
+            result, elapsed = await loop.run_in_executor(
+                self._executor, _timed, func, *args
+            )
+        finally:
+            self._queue_depth -= 1
+
+        self._hash_latency.record(elapsed)
+        self._wait_latency.record(time.perf_counter() - submitted_at - elapsed)
+        return result
+
+    async def hash_password(
+        self, password: str, priority: Priority = Priority.ACCOUNT_UPDATE
+    ) -> str:
+        async with self.admission_controller.admit(priority):
+            hashed_password = await self._run(
+                _hash_password, password.encode(), self.rounds
+            )
+        return hashed_password.decode()
+
+    async def check_password(
+        self,
+        password: str,
+        hashed_password: str,
+        priority: Priority = Priority.LOGIN,
+    ) -> bool:
+        async with self.admission_controller.admit(priority):
+            return await self._run(
+                _check_password, password.encode(), hashed_password.encode()
+            )
+
+    async def calibrate(self, latency_budget_ms: int, min_rounds: int, max_rounds: int):
+        loop = asyncio.get_event_loop()
+        self.rounds = await loop.run_in_executor(
+            self._executor,
+            _calibrate_rounds,
+            latency_budget_ms / 1000,
+            min_rounds,
+            max_rounds,
+        )
+        self.latency_budget_ms = latency_budget_ms
+        logger.info(
+            f"Calibrated bcrypt rounds to {self.rounds} "
+            f"for {latency_budget_ms}ms latency budget"
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return get_rounds(hashed_password) != self.rounds
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "worker_count": self.worker_count,
+            "rounds": self.rounds,
+            "latency_budget_ms": self.latency_budget_ms,
+            "queue_depth": self._queue_depth,
+            "max_queue_depth": self._max_queue_depth,
+            "wait_latency": self._wait_latency.to_dict(),
+            "hash_latency": self._hash_latency.to_dict(),
+            "admission": self.admission_controller.stats(),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
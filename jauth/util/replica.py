@@ -0,0 +1,157 @@
+import itertools
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient, BaseTransactionWrapper
+from tortoise.exceptions import DBConnectionError, OperationalError
+from tortoise.transactions import current_transaction_map
+
+from jauth.exception.overload import ConnectionPoolTimeoutError
+from jauth.task import PeriodicTask
+from jauth.util.cache import LruTtlCache
+from jauth.util.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def get_primary() -> BaseDBAsyncClient:
+    # NOTE: transaction connection if called in transaction
+    return current_transaction_map["default"].get()
+
+
+class ReplicaRouter(PeriodicTask):
+    def __init__(
+        self,
+        replica_connection_names: List[str],
+        max_lag: float = 5,
+        read_your_writes_window: float = 5,
+        check_interval: float = 5,
+        max_recent_writers: int = 100000,
+    ):
+        super().__init__(check_interval)
+        self.replica_connection_names = replica_connection_names
+        self.max_lag = max_lag  # seconds
+        # NOTE: users written by this process recently, their reads go to primary.
+        #  not shared between workers, so other workers may read them from replica
+        self._recent_writers = LruTtlCache(
+            max_size=max_recent_writers, ttl=read_your_writes_window
+        )
+        self._lags: Dict[str, Optional[float]] = {
+            name: None for name in replica_connection_names
+        }
+        self._healthy: List[str] = []
+        self._round_robin = itertools.cycle(replica_connection_names)
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    def record_write(self, user_id: str):
+        self._recent_writers.set(str(user_id), True)
+
+    def _choose_replica(self) -> Optional[str]:
+        for _ in range(len(self.replica_connection_names)):
+            name = next(self._round_robin)
+            if name in self._healthy:
+                return name
+        return None
+
+    def db_for_read(self, user_id: str = None) -> BaseDBAsyncClient:
+        primary = get_primary()
+        if isinstance(primary, BaseTransactionWrapper):
+            return primary
+
+        if user_id is not None and self._recent_writers.get(str(user_id)):
+            self.primary_reads += 1
+            return primary
+
+        name = self._choose_replica()
+        if name is None:
+            self.primary_reads += 1
+            return primary
+
+        self.replica_reads += 1
+        return Tortoise.get_connection(name)
+
+    def _mark_unhealthy(self, db: BaseDBAsyncClient):
+        name = db.connection_name
+        if name in self._healthy:
+            logger.warning(f"Exclude replica {name} until next check")
+            self._healthy.remove(name)
+
+    async def read(
+        self,
+        query: Callable[[BaseDBAsyncClient], Awaitable[T]],
+        user_id: str = None,
+        fallback_on_empty: bool = False,
+    ) -> T:
+        db = self.db_for_read(user_id)
+        if db.connection_name not in self._lags:
+            return await query(db)
+
+        try:
+            result = await query(db)
+        except ConnectionPoolTimeoutError as e:
+            # NOTE: replica is busy rather than broken, so it is not excluded
+            logger.warning(f"Read from replica {db.connection_name} timed out: {e}")
+            self.fallbacks += 1
+            return await query(get_primary())
+        except (DBConnectionError, OperationalError) as e:
+            logger.warning(f"Read from replica {db.connection_name} failed: {e}")
+            self._mark_unhealthy(db)
+            self.fallbacks += 1
+            return await query(get_primary())
+
+        if fallback_on_empty and not result:
+            # NOTE: row may not be replicated yet (e.g. token created just before)
+            self.fallbacks += 1
+            return await query(get_primary())
+        return result
+
+    async def _get_lag(self, name: str) -> Optional[float]:
+        rows = await Tortoise.get_connection(name).execute_query_dict(
+            "SHOW SLAVE STATUS"
+        )
+        if not rows:
+            # NOTE: not a replica (e.g. same server as primary in development)
+            return 0
+        lag = rows[0].get("Seconds_Behind_Master")
+        return None if lag is None else float(lag)
+
+    async def run_once(self):
+        healthy = []
+        for name in self.replica_connection_names:
+            try:
+                lag = await self._get_lag(name)
+            except Exception as e:
+                logger.warning(f"Replica {name} is unavailable: {e!r}")
+                lag = None
+
+            self._lags[name] = lag
+            # NOTE: lag is None when replication is stopped
+            if lag is not None and lag <= self.max_lag:
+                healthy.append(name)
+        self._healthy = healthy
+
+    def stats(self) -> dict:
+        return {
+            "replicas": {
+                name: {"lag": lag, "healthy": name in self._healthy}
+                for name, lag in self._lags.items()
+            },
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+        }
+
+
+async def route_read(
+    replica_router: Optional[ReplicaRouter],
+    query: Callable[[BaseDBAsyncClient], Awaitable[T]],
+    user_id: str = None,
+    fallback_on_empty: bool = False,
+) -> T:
+    if replica_router is None:
+        return await query(get_primary())
+    return await replica_router.read(query, user_id, fallback_on_empty)
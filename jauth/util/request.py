@@ -1,5 +1,6 @@
 import json
 import urllib.parse
+from typing import Optional
 
 import aiohttp
 
@@ -20,6 +21,50 @@ async def _json_response(response):
     return response.status, json_, response.headers
 
 
+class HttpClient:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        connect_timeout: float = 3,
+        read_timeout: float = 5,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # NOTE: created lazily to be bound with running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout,
+                ),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
 class Request:
     DEFAULT_HEADERS = {"Accept": "application/json", "Content-Type": "application/json"}
     DEFAULT_HEADERS_FORM_DATA = {
@@ -27,6 +72,9 @@ class Request:
         "Content-Type": "application/x-www-form-urlencoded",
     }
 
+    def __init__(self, http_client: HttpClient):
+        self.http_client = http_client
+
     async def post(self, url="", parameters=None, headers=None, is_json=True):
         if headers is None:
             headers = {}
@@ -40,11 +88,10 @@ class Request:
         else:
             post_params = {"data": parameters}
             default_header = self.DEFAULT_HEADERS_FORM_DATA
-        async with aiohttp.ClientSession(
-            headers={**default_header, **headers}
-        ) as session:
-            async with session.post(url, **post_params) as resp:
-                return await _json_response(resp)
+        async with self.http_client.session.post(
+            url, headers={**default_header, **headers}, **post_params
+        ) as resp:
+            return await _json_response(resp)
 
     async def delete(self, url="", parameters=None, headers=None):
         if headers is None:
@@ -54,9 +101,8 @@ class Request:
 
         req_url = f"{url}?{urllib.parse.urlencode(parameters)}"
         logger.debug(f"DELETE request to {req_url}")
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.delete(req_url) as resp:
-                return await _json_response(resp)
+        async with self.http_client.session.delete(req_url, headers=headers) as resp:
+            return await _json_response(resp)
 
     async def put(self, url="", parameters=None, headers=None, is_json=True):
         if headers is None:
@@ -71,11 +117,10 @@ class Request:
         else:
             post_params = {"data": parameters}
             default_header = self.DEFAULT_HEADERS_FORM_DATA
-        async with aiohttp.ClientSession(
-            headers={**default_header, **headers}
-        ) as session:
-            async with session.put(url, **post_params) as resp:
-                return await _json_response(resp)
+        async with self.http_client.session.put(
+            url, headers={**default_header, **headers}, **post_params
+        ) as resp:
+            return await _json_response(resp)
 
     async def get(self, url="", parameters=None, headers=None):
         if headers is None:
@@ -85,6 +130,5 @@ class Request:
 
         logger.debug(f"GET request to {url}")
         req_url = f"{url}?{urllib.parse.urlencode(parameters)}"
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(req_url) as resp:
-                return await _json_response(resp)
+        async with self.http_client.session.get(req_url, headers=headers) as resp:
+            return await _json_response(resp)
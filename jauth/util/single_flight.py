@@ -0,0 +1,34 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        # NOTE: concurrent callers with same key share one call and its result or error
+        future = self._calls.get(key)
+        if future is None:
+            self.executed += 1
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._forget(key, future))
+        else:
+            self.shared += 1
+
+        # NOTE: cancelling one caller should not cancel the call of the others
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
@@ -1,15 +1,147 @@
+import asyncio
+import time
+from typing import List
+
 from tortoise import Tortoise
+from tortoise.backends.mysql.client import MySQLClient
+from tortoise.utils import generate_schema_for_client
+
+from jauth.exception.overload import ConnectionPoolTimeoutError
+from jauth.migration.runner import run_migrations
+from jauth.util.metric import LatencyRecorder
+
+
+class InstrumentedPool:
+    def __init__(self, pool, acquire_timeout: float):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout  # seconds, 0 waits forever
+        self.waiters = 0
+        self.timeouts = 0
+        self._acquire_latency = LatencyRecorder()
+
+    def __getattr__(self, name):
+        # NOTE: delegates rest of aiomysql.Pool interface used by tortoise
+        return getattr(self._pool, name)
+
+    def _release_if_acquired(self, acquiring: asyncio.Future):
+        if not acquiring.cancelled() and acquiring.exception() is None:
+            self._pool.release(acquiring.result())
+
+    async def acquire(self):
+        self.waiters += 1
+        started_at = time.perf_counter()
+        acquiring = asyncio.ensure_future(self._pool.acquire())
+        acquired = False
+        try:
+            connection = await asyncio.wait_for(
+                asyncio.shield(acquiring), self.acquire_timeout or None
+            )
+            acquired = True
+            return connection
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ConnectionPoolTimeoutError(retry_after=1)
+        finally:
+            if not acquired:
+                # NOTE: connection acquired after giving up goes back to pool
+                acquiring.cancel()
+                acquiring.add_done_callback(self._release_if_acquired)
+            self.waiters -= 1
+            self._acquire_latency.record(time.perf_counter() - started_at)
+
+    def release(self, connection):
+        return self._pool.release(connection)
+
+    def stats(self) -> dict:
+        return {
+            "minsize": self._pool.minsize,
+            "maxsize": self._pool.maxsize,
+            "in_use": self._pool.size - self._pool.freesize,
+            "idle": self._pool.freesize,
+            "waiters": self.waiters,
+            "timeouts": self.timeouts,
+            "acquire_latency": self._acquire_latency.to_dict(),
+        }
+
+
+class InstrumentedMySQLClient(MySQLClient):
+    def __init__(self, acquire_timeout: float = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.acquire_timeout = float(acquire_timeout)
+
+    async def create_connection(self, with_db: bool) -> None:
+        await super().create_connection(with_db)
+        self._pool = InstrumentedPool(self._pool, self.acquire_timeout)
+
+    def stats(self) -> dict:
+        if not self._pool:
+            return {}
+        return self._pool.stats()
+
+
+# NOTE: makes this module usable as tortoise engine
+client_class = InstrumentedMySQLClient
+
+
+def get_pool_stats(connection_name: str = "default") -> dict:
+    return Tortoise.get_connection(connection_name).stats()
+
+
+def _parse_host(host: str, default_port: int):
+    # e.g) replica-1:3307 -> ("replica-1", 3307)
+    host, _, port = host.partition(":")
+    return host, int(port) if port else default_port
+
+
+async def init_db(
+    host,
+    port,
+    user,
+    password,
+    db,
+    minsize=1,
+    maxsize=5,
+    pool_recycle=-1,
+    connect_timeout=10,
+    acquire_timeout=0,
+    replica_hosts=(),
+    generate=True,
+    migrate=True,
+) -> List[str]:
+    def connection(host_, port_) -> dict:
+        return {
+            "engine": "jauth.util.tortoise",
+            "credentials": {
+                "host": host_,
+                "port": port_,
+                "user": user,
+                "password": password,
+                "database": db,
+                "minsize": minsize,
+                "maxsize": maxsize,
+                "pool_recycle": pool_recycle,
+                "connect_timeout": connect_timeout,
+                "acquire_timeout": acquire_timeout,
+            },
+        }
 
+    connections = {"default": connection(host, port)}
+    replica_connection_names = []
+    for i, replica_host in enumerate(replica_hosts):
+        name = f"replica_{i}"
+        connections[name] = connection(*_parse_host(replica_host, port))
+        replica_connection_names.append(name)
 
-async def init_db(host, port, user, password, db, generate=True):
     await Tortoise.init(
         {
-            "connections": {"default": f"mysql://{user}:{password}@{host}:{port}/{db}"},
+            "connections": connections,
             "apps": {
                 "models": {
                     "models": [
                         "jauth.model.user",
                         "jauth.model.token",
+                        "jauth.model.user_event",
+                        "jauth.model.user_extra",
                     ],
                     # If no default_connection specified, defaults to 'default'
                     "default_connection": "default",
@@ -19,4 +151,9 @@ async def init_db(host, port, user, password, db, generate=True):
     )
     if generate:
         # Generate the schema
-        await Tortoise.generate_schemas(safe=True)
+        # NOTE: on primary only, replicas get it by replication
+        await generate_schema_for_client(Tortoise.get_connection("default"), safe=True)
+    if migrate:
+        # NOTE: brings tables created by older version up to date
+        await run_migrations()
+    return replica_connection_names
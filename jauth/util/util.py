@@ -19,6 +19,12 @@ def json_encoder(o):
         return o.isoformat()
 
 
+def to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
 def to_string(string):
     if isinstance(string, bytes):
         return string.decode()
@@ -0,0 +1,34 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_timestamp_ms = 0
+_last_sequence = 0
+
+
+def uuid7() -> uuid.UUID:
+    # NOTE: 48 bits of unix time in ms followed by random bits (RFC 9562),
+    #  so ids created later sort later and are appended to the end of clustered index
+    global _last_timestamp_ms, _last_sequence
+    with _lock:
+        timestamp_ms = time.time_ns() // 1000000
+        if timestamp_ms > _last_timestamp_ms:
+            # 74 random bits of rand_a and rand_b
+            sequence = int.from_bytes(os.urandom(10), "big") >> 6
+        else:
+            # NOTE: same millisecond (or clock going back) increments random part
+            #  to keep ids of this process monotonic
+            timestamp_ms = _last_timestamp_ms
+            sequence = _last_sequence + 1
+            if sequence >> 74:
+                timestamp_ms += 1
+                sequence = 0
+        _last_timestamp_ms = timestamp_ms
+        _last_sequence = sequence
+
+    rand_a = sequence >> 62
+    rand_b = sequence & ((1 << 62) - 1)
+    value = (timestamp_ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b
+    return uuid.UUID(int=value)
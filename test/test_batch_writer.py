@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from typing import List
+
+from jauth.util.batch_writer import BatchWriter
+
+
+class FakeWrite:
+    def __init__(self, error: Exception = None, delay: float = 0):
+        self.batches: List[List[int]] = []
+        self.error = error
+        self.delay = delay
+
+    async def __call__(self, items: List[int]):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.batches.append(items)
+
+
+class TestBatchWriter(unittest.IsolatedAsyncioTestCase):
+    async def test_flush_after_window(self):
+        write = FakeWrite()
+        writer = BatchWriter(write, window_ms=10, max_batch_size=100)
+
+        await asyncio.gather(*[writer.write(i) for i in range(3)])
+        assert write.batches == [[0, 1, 2]]
+        assert writer.stats()["batches"] == 1
+        assert writer.stats()["pending"] == 0
+
+    async def test_flush_on_max_batch_size(self):
+        write = FakeWrite()
+        # NOTE: window is long enough that only max_batch_size can flush
+        writer = BatchWriter(write, window_ms=60_000, max_batch_size=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(*[writer.write(i) for i in range(4)]), timeout=1
+        )
+        assert write.batches == [[0, 1], [2, 3]]
+        assert writer.stats()["largest_batch_size"] == 2
+
+    async def test_error_propagates_to_every_caller(self):
+        error = RuntimeError("write failed")
+        writer = BatchWriter(FakeWrite(error=error), window_ms=1)
+
+        results = await asyncio.gather(
+            *[writer.write(i) for i in range(3)], return_exceptions=True
+        )
+        assert results == [error, error, error]
+        assert writer.stats()["failed_batches"] == 1
+
+    async def test_cancelled_caller_does_not_break_batch(self):
+        loop = asyncio.get_event_loop()
+        exceptions = []
+        loop.set_exception_handler(lambda _, context: exceptions.append(context))
+        write = FakeWrite(delay=0.01)
+        writer = BatchWriter(write, window_ms=1)
+
+        cancelled = asyncio.ensure_future(writer.write(0))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await writer.write(1)
+
+        assert cancelled.cancelled()
+        assert write.batches == [[0, 1]]
+        assert exceptions == []
+
+    async def test_close_flushes_pending(self):
+        write = FakeWrite()
+        writer = BatchWriter(write, window_ms=60_000)
+
+        waiting = asyncio.ensure_future(writer.write(0))
+        await asyncio.sleep(0)
+        await writer.close()
+        await waiting
+        assert write.batches == [[0]]
+
+    async def test_write_after_close_is_written_directly(self):
+        write = FakeWrite()
+        writer = BatchWriter(write, window_ms=60_000)
+        await writer.close()
+
+        await asyncio.wait_for(writer.write(0), timeout=1)
+        assert write.batches == [[0]]
+        assert writer.stats()["closed"]
+        assert writer.stats()["pending"] == 0
@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+from jauth.exception.third_party import ThirdPartyUnavailableError
+from jauth.external.token.wrapper import GuardedThirdPartyToken
+from jauth.util.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class DummyThirdPartyToken:
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    async def get_user(self, token):
+        if self.error:
+            raise self.error
+        return token
+
+
+def _opened_circuit_breaker() -> CircuitBreaker:
+    circuit_breaker = CircuitBreaker(
+        name="dummy", window_size=4, min_calls=2, open_duration=30
+    )
+    circuit_breaker.before_call()
+    circuit_breaker.on_failure()
+    circuit_breaker.before_call()
+    circuit_breaker.on_failure()
+    return circuit_breaker
+
+
+def _after_open_duration(circuit_breaker: CircuitBreaker):
+    return mock.patch(
+        "jauth.util.circuit_breaker.time.monotonic",
+        return_value=circuit_breaker._opened_at + circuit_breaker.open_duration,
+    )
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_when_failure_rate_exceeds_threshold(self):
+        circuit_breaker = _opened_circuit_breaker()
+        assert circuit_breaker.state == CircuitState.OPEN
+
+        with self.assertRaises(ThirdPartyUnavailableError):
+            circuit_breaker.before_call()
+        assert circuit_breaker.rejected == 1
+
+    def test_stays_closed_until_min_calls(self):
+        circuit_breaker = CircuitBreaker(name="dummy", min_calls=2)
+        circuit_breaker.before_call()
+        circuit_breaker.on_failure()
+        assert circuit_breaker.state == CircuitState.CLOSED
+
+    def test_half_open_allows_single_trial_call(self):
+        circuit_breaker = _opened_circuit_breaker()
+        with _after_open_duration(circuit_breaker):
+            circuit_breaker.before_call()
+            assert circuit_breaker.state == CircuitState.HALF_OPEN
+            with self.assertRaises(ThirdPartyUnavailableError):
+                circuit_breaker.before_call()
+
+    def test_closes_when_trial_call_succeeds(self):
+        circuit_breaker = _opened_circuit_breaker()
+        with _after_open_duration(circuit_breaker):
+            circuit_breaker.before_call()
+        circuit_breaker.on_success(elapsed=0.1)
+        assert circuit_breaker.state == CircuitState.CLOSED
+        circuit_breaker.before_call()
+
+    def test_reopens_when_trial_call_fails(self):
+        circuit_breaker = _opened_circuit_breaker()
+        with _after_open_duration(circuit_breaker):
+            circuit_breaker.before_call()
+        circuit_breaker.on_failure()
+        assert circuit_breaker.state == CircuitState.OPEN
+
+    def test_cancelled_trial_call_gives_slot_back(self):
+        circuit_breaker = _opened_circuit_breaker()
+        with _after_open_duration(circuit_breaker):
+            circuit_breaker.before_call()
+        circuit_breaker.on_cancel()
+        assert circuit_breaker.state == CircuitState.HALF_OPEN
+        circuit_breaker.before_call()
+
+
+class TestGuardedThirdPartyToken(unittest.IsolatedAsyncioTestCase):
+    async def test_unexpected_error_of_trial_call_does_not_leak_slot(self):
+        circuit_breaker = _opened_circuit_breaker()
+        third_party_token = DummyThirdPartyToken(error=KeyError("sub"))
+        guarded = GuardedThirdPartyToken(third_party_token, circuit_breaker)
+
+        with _after_open_duration(circuit_breaker):
+            with self.assertRaises(KeyError):
+                await guarded.get_user("dummy-token")
+        assert circuit_breaker.state == CircuitState.OPEN
+
+        # NOTE: next trial is allowed after open duration again
+        third_party_token.error = None
+        with _after_open_duration(circuit_breaker):
+            assert await guarded.get_user("dummy-token") == "dummy-token"
+        assert circuit_breaker.state == CircuitState.CLOSED
@@ -0,0 +1,46 @@
+import time
+import unittest
+
+import jwt
+
+from jauth.external.token.wrapper import CachedThirdPartyToken
+from jauth.util.cache import LruTtlCache
+
+
+class CountingThirdPartyToken:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_user(self, token):
+        self.calls += 1
+        return token
+
+
+def _id_token(expires_in: float) -> str:
+    token = jwt.encode({"exp": time.time() + expires_in}, "secret")
+    return token.decode() if isinstance(token, bytes) else token
+
+
+class TestCachedThirdPartyToken(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.third_party_token = CountingThirdPartyToken()
+        self.cache = LruTtlCache(max_size=10, ttl=60)
+        self.cached_token = CachedThirdPartyToken(self.third_party_token, self.cache)
+
+    async def test_opaque_token_is_cached_for_ttl(self):
+        await self.cached_token.get_user("access-token")
+        await self.cached_token.get_user("access-token")
+        assert self.third_party_token.calls == 1
+
+    async def test_id_token_is_cached_until_exp(self):
+        token = _id_token(expires_in=30)
+        await self.cached_token.get_user(token)
+        expires_at, _ = next(iter(self.cache._items.values()))
+        assert expires_at <= time.monotonic() + 30
+
+    async def test_expired_id_token_is_not_cached(self):
+        token = _id_token(expires_in=-1)
+        await self.cached_token.get_user(token)
+        await self.cached_token.get_user(token)
+        assert self.third_party_token.calls == 2
+        assert len(self.cache) == 0
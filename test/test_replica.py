@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+from tortoise.exceptions import DBConnectionError
+
+from jauth.exception.overload import ConnectionPoolTimeoutError
+from jauth.util.replica import ReplicaRouter
+
+
+class DummyConnection:
+    def __init__(self, connection_name: str):
+        self.connection_name = connection_name
+
+
+class TestReplicaRouter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.primary = DummyConnection("default")
+        self.replica = DummyConnection("replica_0")
+        self.router = ReplicaRouter(["replica_0"])
+        self.router._healthy = ["replica_0"]
+        patcher = mock.patch(
+            "jauth.util.replica.get_primary", return_value=self.primary
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router.db_for_read = lambda user_id=None: self.replica
+
+    def _query(self, error: Exception):
+        async def query(db):
+            if db is self.replica:
+                raise error
+            return db.connection_name
+
+        return query
+
+    async def test_falls_back_to_primary_when_replica_pool_is_exhausted(self):
+        result = await self.router.read(self._query(ConnectionPoolTimeoutError()))
+        assert result == "default"
+        assert self.router.fallbacks == 1
+        assert self.router._healthy == ["replica_0"]
+
+    async def test_excludes_replica_when_connection_fails(self):
+        result = await self.router.read(self._query(DBConnectionError("gone")))
+        assert result == "default"
+        assert self.router._healthy == []
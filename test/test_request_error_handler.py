@@ -0,0 +1,38 @@
+import json
+import unittest
+
+from jauth.decorator.request import request_error_handler
+from jauth.exception.overload import ConnectionPoolTimeoutError
+from jauth.exception.request import RequestError
+
+
+class TestRequestErrorHandler(unittest.IsolatedAsyncioTestCase):
+    async def test_overload_error_is_service_unavailable(self):
+        @request_error_handler
+        async def handler():
+            raise ConnectionPoolTimeoutError(retry_after=3)
+
+        response = await handler()
+        assert response.status == 503
+        assert response.headers["Retry-After"] == "3"
+        assert (
+            json.loads(response.body._value)["reason"]
+            == ConnectionPoolTimeoutError.message
+        )
+
+    async def test_request_error_is_bad_request(self):
+        @request_error_handler
+        async def handler():
+            raise RequestError("invalid")
+
+        response = await handler()
+        assert response.status == 400
+        assert "Retry-After" not in response.headers
+
+    async def test_unknown_error_is_internal_server_error(self):
+        @request_error_handler
+        async def handler():
+            raise RuntimeError("unknown")
+
+        response = await handler()
+        assert response.status == 500
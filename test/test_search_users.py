@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+from jauth.resource.internal import InternalHttpResource
+from jauth.structure.cursor import TotalMode
+
+
+def _request(body: dict):
+    request = mock.Mock(headers={"X-Server-Key": "dummy-key"})
+    request.json = mock.AsyncMock(return_value=body)
+    return request
+
+
+class TestSearchUsers(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.user_repository = mock.Mock()
+        self.user_repository.search_users = mock.AsyncMock(return_value=(None, []))
+        self.internal_resource = InternalHttpResource(
+            user_repository=self.user_repository,
+            secret={"jwt_secret": "dummy-secret", "internal_api_keys": ["dummy-key"]},
+            metric_registry=mock.Mock(),
+        )
+
+    async def test_cursor_pagination_does_not_skip_start(self):
+        response = await self.internal_resource.search_users(
+            _request({"pagination": "cursor", "start": 20, "size": 10})
+        )
+        assert response.status == 200
+        _, kwargs = self.user_repository.search_users.call_args
+        assert kwargs["start"] == 0
+        assert kwargs["total_mode"] == TotalMode.EXACT
+
+    async def test_offset_pagination_skips_start(self):
+        await self.internal_resource.search_users(
+            _request({"pagination": "offset", "start": 20, "size": 10})
+        )
+        _, kwargs = self.user_repository.search_users.call_args
+        assert kwargs["start"] == 20
+
+    async def test_cursor_pagination_rejects_empty_page(self):
+        response = await self.internal_resource.search_users(
+            _request({"pagination": "cursor", "size": 0})
+        )
+        assert response.status == 400
+        self.user_repository.search_users.assert_not_called()
@@ -0,0 +1,95 @@
+import datetime
+import unittest
+import uuid
+from unittest import mock
+
+from tortoise import Tortoise
+
+from jauth.repository.token_memory import InMemoryTokenRepositoryImpl
+from jauth.resource.token import TokenHttpResource
+from jauth.task.token_sweeper import ExpiredTokenSweeper
+from jauth.util.util import utc_now
+
+
+class TestInMemoryTokenRepository(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # NOTE: Token model instances are returned, so models are registered
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["jauth.model.token"]}
+        )
+        self.token_repository = InMemoryTokenRepositoryImpl()
+        self.token_resource = TokenHttpResource(
+            user_repository=mock.Mock(),
+            token_repository=self.token_repository,
+            secret={"jwt_secret": "dummy-secret"},
+            external={
+                "third_party": {
+                    "facebook": mock.Mock(),
+                    "kakao": mock.Mock(),
+                    "apple": mock.Mock(),
+                    "google": mock.Mock(),
+                }
+            },
+            password_hasher=mock.Mock(),
+        )
+        self.user_id = str(uuid.uuid4())
+
+    async def asyncTearDown(self) -> None:
+        await Tortoise.close_connections()
+
+    def _expire(self, token_id: str):
+        record = self.token_repository._tokens[token_id]
+        self.token_repository._tokens[token_id] = record._replace(
+            created_at=record.created_at
+            - datetime.timedelta(
+                seconds=TokenHttpResource.REFRESH_TOKEN_EXPIRE_TIME + 1
+            )
+        )
+
+    async def test_refresh_with_created_token(self):
+        token = await self.token_repository.create_token(user_id=self.user_id)
+        user_id = await self.token_resource._get_user_id_by_refresh_token(str(token.id))
+        assert user_id == self.user_id
+
+    async def test_refresh_with_unknown_token(self):
+        assert (
+            await self.token_resource._get_user_id_by_refresh_token("unknown") is None
+        )
+
+    async def test_refresh_with_expired_token(self):
+        token = await self.token_repository.create_token(user_id=self.user_id)
+        self._expire(str(token.id))
+        user_id = await self.token_resource._get_user_id_by_refresh_token(str(token.id))
+        assert user_id is None
+
+    async def test_sweeper_deletes_only_expired_tokens(self):
+        expired_tokens = [
+            await self.token_repository.create_token(user_id=self.user_id)
+            for _ in range(3)
+        ]
+        for token in expired_tokens:
+            self._expire(str(token.id))
+        token = await self.token_repository.create_token(user_id=self.user_id)
+
+        sweeper = ExpiredTokenSweeper(
+            self.token_repository,
+            expire_seconds=TokenHttpResource.REFRESH_TOKEN_EXPIRE_TIME,
+            batch_size=2,
+            batch_interval=0,
+        )
+        await sweeper.run_once()
+        assert sweeper.stats()["last_swept"] == 3
+        assert await self.token_repository.find_token_record_by_id(str(token.id))
+
+    async def test_delete_token(self):
+        token = await self.token_repository.create_token(user_id=self.user_id)
+        assert await self.token_repository.delete_token(str(token.id)) == 1
+        assert await self.token_repository.find_token_by_id(str(token.id)) is None
+        assert await self.token_repository.delete_token(str(token.id)) == 0
+
+    async def test_created_after_filter(self):
+        token = await self.token_repository.create_token(user_id=self.user_id)
+        record = await self.token_repository.find_token_record_by_id(
+            str(token.id), created_after=utc_now() + datetime.timedelta(seconds=1)
+        )
+        assert record is None
@@ -0,0 +1,121 @@
+import datetime
+import unittest
+import uuid
+from typing import List
+
+from tortoise import Tortoise
+
+from jauth.exception.callback import CallbackDeliveryError
+from jauth.external.callback.base import BaseCallbackHandler
+from jauth.model.user_event import UserEvent, UserEventStatus, UserEventType
+from jauth.repository.user_event import UserEventRepositoryImpl
+from jauth.task.user_event_dispatcher import UserEventDispatcher
+from jauth.util.util import utc_now
+
+
+class FlakyCallbackHandler(BaseCallbackHandler):
+    def __init__(self, failing_urls: List[str]):
+        super().__init__([("http://a", ""), ("http://b", "")])
+        self.failing_urls = failing_urls
+        self.requested_urls = []
+
+    async def handle(self, message: dict, delivered_urls: List[str] = ()) -> bool:
+        urls = [url for url, _ in self.pending_urls(delivered_urls)]
+        self.requested_urls.append(urls)
+        failed_urls = [url for url in urls if url in self.failing_urls]
+        if failed_urls:
+            raise CallbackDeliveryError(
+                ", ".join(failed_urls),
+                delivered_urls=[url for url in urls if url not in failed_urls],
+            )
+        return True
+
+
+class TestUserEvent(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["jauth.model.user_event"]}
+        )
+        await Tortoise.generate_schemas()
+        self.user_event_repository = UserEventRepositoryImpl()
+
+    async def asyncTearDown(self) -> None:
+        await Tortoise.close_connections()
+
+    async def _create_event(self, user_id: str) -> UserEvent:
+        return await self.user_event_repository.create_user_event(
+            user_id=user_id, event_type=UserEventType.UPDATE, payload={}
+        )
+
+    async def test_backing_off_events_do_not_block_other_users(self):
+        backing_off_user_ids = [str(uuid.uuid4()) for _ in range(3)]
+        for user_id in backing_off_user_ids:
+            await self._create_event(user_id)
+        await UserEvent.all().update(
+            next_attempt_at=utc_now() + datetime.timedelta(minutes=10)
+        )
+        event = await self._create_event(str(uuid.uuid4()))
+
+        claimed_events = await self.user_event_repository.claim_pending_events(
+            limit=3, lease_seconds=60
+        )
+        assert [claimed_event.id for claimed_event in claimed_events] == [event.id]
+
+    async def test_only_oldest_event_of_user_is_claimed(self):
+        user_id = str(uuid.uuid4())
+        oldest_event = await self._create_event(user_id)
+        await self._create_event(user_id)
+
+        claimed_events = await self.user_event_repository.claim_pending_events(
+            limit=10, lease_seconds=60
+        )
+        assert [claimed_event.id for claimed_event in claimed_events] == [
+            oldest_event.id
+        ]
+        # NOTE: leased event still blocks younger events of the user
+        assert not await self.user_event_repository.claim_pending_events(
+            limit=10, lease_seconds=60
+        )
+
+    async def test_mark_after_lease_is_taken_over(self):
+        await self._create_event(str(uuid.uuid4()))
+        (event,) = await self.user_event_repository.claim_pending_events(
+            limit=10, lease_seconds=60
+        )
+        await UserEvent.filter(id=event.id).update(locked_until=utc_now())
+        (taken_over_event,) = await self.user_event_repository.claim_pending_events(
+            limit=10, lease_seconds=60
+        )
+
+        assert not await self.user_event_repository.mark_delivered(event, attempts=1)
+        assert await self.user_event_repository.mark_delivered(
+            taken_over_event, attempts=1
+        )
+
+    async def test_retry_only_failed_urls(self):
+        await self._create_event(str(uuid.uuid4()))
+        handler = FlakyCallbackHandler(failing_urls=["http://b"])
+        dispatcher = UserEventDispatcher(
+            self.user_event_repository,
+            handlers={UserEventType.UPDATE: handler},
+            base_backoff=0,
+        )
+
+        await dispatcher.run_once()
+        handler.failing_urls = []
+        await dispatcher.run_once()
+
+        assert handler.requested_urls == [["http://a", "http://b"], ["http://b"]]
+        assert (await UserEvent.first()).status == UserEventStatus.DELIVERED
+        assert dispatcher.stats()["retried"] == 1
+        assert dispatcher.stats()["delivered"] == 1
+
+    def test_callback_timeout_must_be_under_half_of_lease(self):
+        handler = FlakyCallbackHandler(failing_urls=[])
+        handler.timeout = 40
+        with self.assertRaises(ValueError):
+            UserEventDispatcher(
+                self.user_event_repository,
+                handlers={UserEventType.UPDATE: handler},
+                lease_seconds=60,
+            )
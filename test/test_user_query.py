@@ -0,0 +1,19 @@
+import unittest
+
+from jauth.exception.request import InvalidFilterError, RequestError
+from jauth.model.user import UserStatus, UserType
+from jauth.repository.user_query import UserSearchQueryBuilder, to_enums
+
+
+class TestUserSearchQueryBuilder(unittest.TestCase):
+    def test_to_enums(self):
+        assert to_enums(UserType, [1, 2], "types") == [UserType.EMAIL, UserType.GOOGLE]
+
+    def test_unknown_type_is_request_error(self):
+        with self.assertRaises(InvalidFilterError) as context:
+            UserSearchQueryBuilder().types([1, 99])
+        assert isinstance(context.exception, RequestError)
+
+    def test_unknown_status_is_request_error(self):
+        with self.assertRaises(InvalidFilterError):
+            UserSearchQueryBuilder().status([UserStatus.NORMAL, 99])
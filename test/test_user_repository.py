@@ -0,0 +1,67 @@
+import unittest
+
+from tortoise import Tortoise
+
+from jauth.model.user import User, UserType
+from jauth.repository.user import UserRepositoryImpl
+from jauth.structure.record import UserRecord
+from jauth.util.cache import LruTtlCache
+
+MODELS = [
+    "jauth.model.user",
+    "jauth.model.token",
+    "jauth.model.user_event",
+    "jauth.model.user_extra",
+]
+
+
+class TestUserRepositoryCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await Tortoise.init(db_url="sqlite://:memory:", modules={"models": MODELS})
+        await Tortoise.generate_schemas()
+        self.user_cache = LruTtlCache(max_size=10, ttl=60)
+        self.user_repository = UserRepositoryImpl(user_cache=self.user_cache)
+        self.user = await self.user_repository.create_user(
+            user_type=UserType.EMAIL,
+            email="dummy@user.com",
+            account="dummy",
+            extra={"nickname": "dummy"},
+        )
+        self.user_id = str(self.user.id)
+
+    async def asyncTearDown(self) -> None:
+        await Tortoise.close_connections()
+
+    async def test_update_invalidates_cached_user(self):
+        await self.user_repository.find_user_by_id(self.user_id)
+        await self.user_repository.update_user(self.user_id, email="new@user.com")
+        user = await self.user_repository.find_user_by_id(self.user_id)
+        assert user.email == "new@user.com"
+
+    async def test_record_cached_before_commit_is_invalidated_after_commit(self):
+        async with self.user_repository.transaction():
+            await self.user_repository.update_user(self.user_id, email="new@user.com")
+            # NOTE: read of another request which saw the row before commit
+            stale_record = UserRecord.from_model(self.user)
+            self.user_cache.set(self.user_id, stale_record)
+        user = await self.user_repository.find_user_by_id(self.user_id)
+        assert user.email == "new@user.com"
+
+    async def test_cached_record_does_not_share_extra(self):
+        user = await self.user_repository.find_user_by_id(self.user_id)
+        user.extra["nickname"] = "changed"
+        user = await self.user_repository.find_user_by_id(self.user_id)
+        assert user.extra == {"nickname": "dummy"}
+        assert self.user_cache.stats()["hits"] == 1
+
+    async def test_read_from_primary_skips_cache(self):
+        await self.user_repository.find_user_by_id(self.user_id)
+        # NOTE: written by another worker, so cache of this worker is not invalidated
+        await User.filter(id=self.user_id).update(hashed_password="changed")
+
+        user = await self.user_repository.find_user_by_id(self.user_id)
+        assert user.hashed_password != "changed"
+        user = await self.user_repository.find_user_by_id(
+            self.user_id, from_primary=True
+        )
+        assert user.hashed_password == "changed"